@@ -64,6 +64,7 @@ def editable_facility_form() -> rx.Component:
             class_name="grid grid-cols-2 gap-4 p-4 border-b",
         ),
         facility_type_selector(),
+        lock_status_selector(),
         rx.el.div(
             rx.el.button(
                 "Save Changes",
@@ -88,6 +89,21 @@ def editor_input_field(label: str, field_name: str, value: rx.Var) -> rx.Compone
     )
 
 
+def lock_status_selector() -> rx.Component:
+    return rx.el.div(
+        rx.el.h4("Optimization Constraint", class_name="font-semibold text-md mb-2"),
+        rx.el.select(
+            rx.el.option("Free to open or close", value="none"),
+            rx.el.option("Locked open", value="open"),
+            rx.el.option("Locked closed", value="closed"),
+            value=FacilityEditorState.edited_facility["lock_status"],
+            on_change=lambda val: FacilityEditorState.handle_edit("lock_status", val),
+            class_name="w-full p-1.5 border rounded-md text-sm bg-white",
+        ),
+        class_name="p-4 border-b",
+    )
+
+
 def facility_type_selector() -> rx.Component:
     return rx.el.div(
         rx.el.h4("Facility Types", class_name="font-semibold text-md mb-2"),
@@ -1,8 +1,14 @@
 import reflex as rx
-from app.states.simulation_state import SimulationState
+from app.states.simulation_state import (
+    OPTIMIZATION_JOB,
+    SIMULATION_JOB,
+    SimulationState,
+)
 from app.states.scenario_state import ScenarioState
 from app.states.map_state import FACILITY_COLORS
 from app.components.export import export_button
+from app.engine.optimization import OPTIMIZATION_MODES, PARETO_FRONTIER, ParetoPoint
+from app.engine.sensitivity import RateScenario
 
 
 def simulation_panel() -> rx.Component:
@@ -31,6 +37,11 @@ def simulation_panel() -> rx.Component:
             optimization_results_display(),
             rx.el.div(),
         ),
+        rx.cond(
+            SimulationState.pareto_frontier.length() > 0,
+            pareto_frontier_display(),
+            rx.el.div(),
+        ),
         rx.cond(
             SimulationState.simulation_result.is_not_none(),
             simulation_results_display(),
@@ -78,6 +89,16 @@ def simulation_runner() -> rx.Component:
             "Calculate network costs and service levels for the current configuration.",
             class_name="text-sm text-gray-600 mt-1",
         ),
+        rx.el.div(
+            rx.el.label("Demand Chunk Size", class_name="text-sm font-medium"),
+            rx.el.input(
+                type="number",
+                default_value=SimulationState.simulation_chunk_size.to_string(),
+                on_change=SimulationState.set_simulation_chunk_size,
+                class_name="w-full p-1 border rounded-md text-sm",
+            ),
+            class_name="mt-4",
+        ),
         rx.el.button(
             rx.cond(
                 SimulationState.is_simulating,
@@ -96,6 +117,7 @@ def simulation_runner() -> rx.Component:
                 rx.el.progress(
                     value=SimulationState.simulation_progress, class_name="w-full mt-2"
                 ),
+                cancel_button(SIMULATION_JOB),
                 class_name="pt-2",
             ),
             rx.el.div(),
@@ -114,7 +136,8 @@ def optimization_runner() -> rx.Component:
         rx.el.div(
             rx.el.div(
                 rx.el.label(
-                    "Number of DCs to Select (X)", class_name="text-sm font-medium"
+                    "Number of DCs to Select (X, incl. locked open)",
+                    class_name="text-sm font-medium",
                 ),
                 rx.el.input(
                     type="number",
@@ -136,6 +159,65 @@ def optimization_runner() -> rx.Component:
                     class_name="w-full p-1.5 border rounded-md text-sm bg-white",
                 ),
             ),
+            rx.el.div(
+                rx.el.label("Optimization Mode", class_name="text-sm font-medium"),
+                rx.el.select(
+                    rx.foreach(OPTIMIZATION_MODES, lambda m: rx.el.option(m, value=m)),
+                    value=SimulationState.optimization_mode,
+                    on_change=SimulationState.set_optimization_mode,
+                    class_name="w-full p-1.5 border rounded-md text-sm bg-white",
+                ),
+                class_name="col-span-2",
+            ),
+            rx.el.div(
+                rx.el.label(
+                    "Time Budget (seconds, 0 = none)", class_name="text-sm font-medium"
+                ),
+                rx.el.input(
+                    type="number",
+                    default_value=SimulationState.optimization_time_budget.to_string(),
+                    on_change=SimulationState.set_optimization_time_budget,
+                    class_name="w-full p-1 border rounded-md text-sm",
+                ),
+                class_name="col-span-2",
+            ),
+            rx.el.div(
+                rx.el.label(
+                    "Service Penalty ($/unit beyond 24h)",
+                    class_name="text-sm font-medium",
+                ),
+                rx.el.input(
+                    type="number",
+                    default_value=SimulationState.service_penalty.to_string(),
+                    on_change=SimulationState.set_service_penalty,
+                    class_name="w-full p-1 border rounded-md text-sm",
+                ),
+            ),
+            rx.el.div(
+                rx.el.label("Random Seed", class_name="text-sm font-medium"),
+                rx.el.input(
+                    type="number",
+                    default_value=SimulationState.optimization_seed.to_string(),
+                    on_change=SimulationState.set_optimization_seed,
+                    class_name="w-full p-1 border rounded-md text-sm",
+                ),
+            ),
+            rx.cond(
+                SimulationState.optimization_mode == PARETO_FRONTIER,
+                rx.el.div(
+                    rx.el.label(
+                        "Penalty Weights ($/unit beyond 24h, comma-separated)",
+                        class_name="text-sm font-medium",
+                    ),
+                    rx.el.input(
+                        default_value=SimulationState.pareto_penalties,
+                        on_change=SimulationState.set_pareto_penalties,
+                        class_name="w-full p-1 border rounded-md text-sm",
+                    ),
+                    class_name="col-span-2",
+                ),
+                rx.fragment(),
+            ),
             class_name="grid grid-cols-2 gap-4 mt-4",
         ),
         rx.el.button(
@@ -158,6 +240,7 @@ def optimization_runner() -> rx.Component:
                     class_name="w-full mt-2",
                 ),
                 rx.el.p(f"Progress: {SimulationState.optimization_progress:.0f}%"),
+                cancel_button(OPTIMIZATION_JOB),
                 class_name="pt-2 text-center text-sm",
             ),
             rx.el.div(),
@@ -166,6 +249,15 @@ def optimization_runner() -> rx.Component:
     )
 
 
+def cancel_button(kind: str) -> rx.Component:
+    return rx.el.button(
+        rx.icon("circle_stop", class_name="mr-2"),
+        "Cancel",
+        on_click=SimulationState.cancel_run(kind),
+        class_name="w-full flex items-center justify-center p-2 mt-2 text-sm border rounded-md hover:bg-gray-100",
+    )
+
+
 def optimization_results_display() -> rx.Component:
     return rx.el.div(
         rx.el.h4(
@@ -178,7 +270,16 @@ def optimization_results_display() -> rx.Component:
                     class_name="p-2 bg-green-100 rounded-full",
                 ),
                 rx.el.div(
-                    rx.el.p("Optimal Cost", class_name="text-sm text-gray-500"),
+                    rx.el.p(
+                        rx.match(
+                            SimulationState.optimization_result["status"],
+                            ("cancelled", "Best Cost (cancelled)"),
+                            ("running", "Best Cost So Far"),
+                            ("time_limit", "Best Cost (time limit)"),
+                            "Optimal Cost",
+                        ),
+                        class_name="text-sm text-gray-500",
+                    ),
                     rx.el.p(
                         f"${SimulationState.optimization_result['best_cost']:,.0f}",
                         class_name="text-lg font-bold",
@@ -193,6 +294,24 @@ def optimization_results_display() -> rx.Component:
                 ),
                 class_name="flex items-center gap-4 p-4 bg-gray-50 rounded-lg",
             ),
+            rx.el.div(
+                rx.el.span(
+                    f"Solved in {SimulationState.optimization_result['solve_seconds']:.1f}s"
+                ),
+                rx.cond(
+                    SimulationState.optimization_result["service_penalty_cost"] > 0,
+                    rx.el.span(
+                        f"Service penalty ${SimulationState.optimization_result['service_penalty_cost']:,.0f}"
+                    ),
+                ),
+                rx.cond(
+                    SimulationState.optimization_result["optimality_gap"].is_not_none(),
+                    rx.el.span(
+                        f"Optimality gap {SimulationState.optimization_result['optimality_gap']:.2f}%"
+                    ),
+                ),
+                class_name="flex justify-between text-xs text-gray-500 px-1",
+            ),
             rx.el.div(
                 rx.el.h5(
                     "Optimal Facility Set", class_name="font-semibold mt-4 mb-2 text-sm"
@@ -215,6 +334,69 @@ def optimization_results_display() -> rx.Component:
     )
 
 
+def pareto_frontier_display() -> rx.Component:
+    return rx.el.div(
+        rx.el.h4("Cost / Service Frontier", class_name="font-semibold text-md mb-2"),
+        rx.el.div(
+            rx.el.table(
+                rx.el.thead(
+                    rx.el.tr(
+                        rx.el.th(
+                            "# DCs",
+                            class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                        ),
+                        rx.el.th(
+                            "Penalty",
+                            class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                        ),
+                        rx.el.th(
+                            "Total Cost",
+                            class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                        ),
+                        rx.el.th(
+                            "Service <24h",
+                            class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                        ),
+                        rx.el.th(
+                            "Facilities",
+                            class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                        ),
+                        class_name="bg-gray-50",
+                    )
+                ),
+                rx.el.tbody(
+                    rx.foreach(SimulationState.pareto_frontier, pareto_frontier_row),
+                    class_name="bg-white divide-y divide-gray-200",
+                ),
+                class_name="min-w-full divide-y divide-gray-200",
+            ),
+            class_name="border rounded-lg overflow-auto",
+        ),
+        class_name="p-4",
+    )
+
+
+def pareto_frontier_row(point: ParetoPoint) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            point["num_dcs"].to_string(), class_name="px-4 py-3 whitespace-nowrap"
+        ),
+        rx.el.td(
+            f"${point['service_penalty']:,.0f}",
+            class_name="px-4 py-3 whitespace-nowrap",
+        ),
+        rx.el.td(
+            f"${point['total_cost']:,.0f}", class_name="px-4 py-3 whitespace-nowrap"
+        ),
+        rx.el.td(
+            f"{point['next_day_share']:.1f}%",
+            class_name="px-4 py-3 whitespace-nowrap",
+        ),
+        rx.el.td(point["facilities"].join(", "), class_name="px-4 py-3"),
+        class_name="hover:bg-gray-50 text-sm",
+    )
+
+
 def simulation_results_display() -> rx.Component:
     return rx.el.div(
         rx.el.h4("Dashboard", class_name="font-semibold text-md px-4 pt-4 mb-2"),
@@ -252,10 +434,111 @@ def simulation_results_display() -> rx.Component:
             class_name="grid grid-cols-1 md:grid-cols-2 gap-4 mt-4",
         ),
         facility_utilization_card(),
+        inbound_volume_card(),
+        rate_sensitivity_card(),
         class_name="p-4 space-y-4",
     )
 
 
+def rate_sensitivity_card() -> rx.Component:
+    return rx.el.div(
+        rx.el.h5("Rate Sensitivity", class_name="font-semibold mb-2"),
+        rx.el.div(
+            rx.el.div(
+                rx.el.label("Parcel Rates ($/mile)", class_name="text-sm font-medium"),
+                rx.el.input(
+                    default_value=SimulationState.rate_sweep_parcel,
+                    on_change=SimulationState.set_rate_sweep_parcel,
+                    class_name="w-full p-1 border rounded-md text-sm",
+                ),
+            ),
+            rx.el.div(
+                rx.el.label("TL Rates ($/mile)", class_name="text-sm font-medium"),
+                rx.el.input(
+                    default_value=SimulationState.rate_sweep_tl,
+                    on_change=SimulationState.set_rate_sweep_tl,
+                    class_name="w-full p-1 border rounded-md text-sm",
+                ),
+            ),
+            class_name="grid grid-cols-2 gap-4",
+        ),
+        rx.el.button(
+            rx.icon("sliders-horizontal", class_name="mr-2"),
+            "Sweep Rates",
+            on_click=SimulationState.run_rate_sweep,
+            class_name="w-full flex items-center justify-center p-2 mt-2 text-sm border rounded-md hover:bg-gray-100",
+        ),
+        rx.cond(
+            SimulationState.rate_sweep_results.length() > 0,
+            rx.el.div(
+                rx.el.table(
+                    rx.el.thead(
+                        rx.el.tr(
+                            rx.el.th(
+                                "Parcel",
+                                class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                            ),
+                            rx.el.th(
+                                "TL",
+                                class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                            ),
+                            rx.el.th(
+                                "Inbound",
+                                class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                            ),
+                            rx.el.th(
+                                "Outbound",
+                                class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                            ),
+                            rx.el.th(
+                                "Total Cost",
+                                class_name="px-4 py-3 text-left text-sm font-semibold text-gray-600",
+                            ),
+                            class_name="bg-gray-50",
+                        )
+                    ),
+                    rx.el.tbody(
+                        rx.foreach(
+                            SimulationState.rate_sweep_results, rate_scenario_row
+                        ),
+                        class_name="bg-white divide-y divide-gray-200",
+                    ),
+                    class_name="min-w-full divide-y divide-gray-200",
+                ),
+                class_name="border rounded-lg overflow-auto mt-2",
+            ),
+            rx.el.div(),
+        ),
+        class_name="p-4 border rounded-lg bg-white",
+    )
+
+
+def rate_scenario_row(scenario: RateScenario) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(
+            f"${scenario['mode_costs']['Parcel']:.2f}",
+            class_name="px-4 py-3 whitespace-nowrap",
+        ),
+        rx.el.td(
+            f"${scenario['mode_costs']['TL']:.2f}",
+            class_name="px-4 py-3 whitespace-nowrap",
+        ),
+        rx.el.td(
+            f"${scenario['inbound_cost']:,.0f}",
+            class_name="px-4 py-3 whitespace-nowrap",
+        ),
+        rx.el.td(
+            f"${scenario['outbound_cost']:,.0f}",
+            class_name="px-4 py-3 whitespace-nowrap",
+        ),
+        rx.el.td(
+            f"${scenario['total_cost']:,.0f}",
+            class_name="px-4 py-3 whitespace-nowrap font-medium",
+        ),
+        class_name="hover:bg-gray-50 text-sm",
+    )
+
+
 def metric_card(title: str, value: str, icon_name: str) -> rx.Component:
     return rx.el.div(
         rx.el.div(
@@ -332,4 +615,19 @@ def facility_utilization_card() -> rx.Component:
             ),
         ),
         class_name="p-4 border rounded-lg bg-white",
+    )
+
+
+def inbound_volume_card() -> rx.Component:
+    return rx.el.div(
+        rx.el.h5("Inbound Volume by Source (Top 5)", class_name="font-semibold mb-2"),
+        rx.foreach(
+            SimulationState.sorted_inbound_volume,
+            lambda item: rx.el.div(
+                rx.el.p(item[0], class_name="truncate"),
+                rx.el.p(f"{item[1]:,} units", class_name="font-semibold"),
+                class_name="flex justify-between items-center text-sm p-2 bg-gray-50 rounded",
+            ),
+        ),
+        class_name="p-4 border rounded-lg bg-white",
     )
\ No newline at end of file
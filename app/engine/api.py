@@ -0,0 +1,192 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, Iterator, Mapping, Sequence, TypedDict
+from app.engine.model import NetworkModel, compile_network
+from app.engine.optimization import (
+    GREEDY_INTERCHANGE,
+    OPTIMIZATION_MODES,
+    OptimizationResult,
+    ParetoPoint,
+)
+from app.engine.result_cache import SIMULATION_CACHE, simulation_key
+from app.engine.search import (
+    SearchOutcome,
+    SearchRunner,
+    optimization_problem,
+    run_search,
+)
+from app.engine.simulation import SimulationResult, finalize_result, simulate_chunk
+
+Records = Sequence[Mapping[str, Any]]
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """One network to evaluate; records have the same fields as the app's state."""
+
+    name: str
+    facilities: Records
+    demands: Records
+    products: Records = ()
+    transport_costs: Records = ()
+    edge_overrides: Records = ()
+    inbound_sources: Records = ()
+    candidate_facility_type: str = "DC"
+
+    def compile(self, service_penalty: float = 0.0) -> NetworkModel:
+        return compile_network(
+            facilities=self.facilities,
+            demands=self.demands,
+            products=self.products,
+            transport_costs=self.transport_costs,
+            edge_overrides=self.edge_overrides,
+            inbound_sources=self.inbound_sources,
+            network_key=self.name,
+            assign_facility_type=self.candidate_facility_type,
+            service_penalty=service_penalty,
+        )
+
+
+@dataclass(frozen=True)
+class OptimizationSettings:
+    mode: str = GREEDY_INTERCHANGE
+    num_dcs: int = 5
+    time_budget: float = 0.0
+    seed: int = 0
+    service_penalty: float = 0.0
+    pareto_penalties: tuple[float, ...] = (0.0, 25.0, 100.0, 400.0)
+
+    def __post_init__(self):
+        if self.mode not in OPTIMIZATION_MODES:
+            raise ValueError(
+                f"Unknown optimization mode {self.mode!r}; "
+                f"expected one of {', '.join(OPTIMIZATION_MODES)}."
+            )
+
+
+class ScenarioReport(TypedDict):
+    name: str
+    simulation: SimulationResult | None
+    optimization: OptimizationResult | None
+    pareto_frontier: list[ParetoPoint]
+    error: str | None
+
+
+def simulate_network(model: NetworkModel) -> SimulationResult:
+    """Simulate in this process, sharing the memoized totals with the app."""
+    cache_key = simulation_key(model)
+    totals = SIMULATION_CACHE.get(cache_key)
+    if totals is None:
+        totals = simulate_chunk(model)
+        SIMULATION_CACHE.put(cache_key, totals)
+    return finalize_result(model, totals)
+
+
+def _run_inline(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """Drive a coroutine that never suspends, as SearchRunner's are.
+
+    Unlike asyncio.run this also works under a running event loop.
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("An in-process search tried to suspend.")
+
+
+def optimize(
+    model: NetworkModel, facility_type: str, settings: OptimizationSettings
+) -> SearchOutcome:
+    """Optimize in this process through the same run_search the app uses.
+
+    Raises ValueError when the network has nothing to optimize.
+    """
+    problem = optimization_problem(
+        model, facility_type, settings.num_dcs, settings.mode
+    )
+    return _run_inline(
+        run_search(
+            problem,
+            SearchRunner(settings.time_budget),
+            settings.seed,
+            settings.pareto_penalties,
+        )
+    )
+
+
+def error_report(name: str, error: str) -> ScenarioReport:
+    return {
+        "name": name,
+        "simulation": None,
+        "optimization": None,
+        "pareto_frontier": [],
+        "error": error,
+    }
+
+
+def run_scenario(
+    scenario: Scenario, settings: OptimizationSettings | None = None
+) -> ScenarioReport:
+    """Simulate the scenario and, with settings, optimize its candidate sites.
+
+    A failed optimization keeps the simulation and sets ``error``.
+    """
+    model = scenario.compile(settings.service_penalty if settings else 0.0)
+    report: ScenarioReport = {
+        "name": scenario.name,
+        "simulation": simulate_network(model),
+        "optimization": None,
+        "pareto_frontier": [],
+        "error": None,
+    }
+    if settings is None:
+        return report
+    try:
+        outcome = optimize(model, scenario.candidate_facility_type, settings)
+    except Exception as e:
+        logging.exception(f"Optimizing scenario {scenario.name} failed: {e}")
+        report["error"] = str(e)
+        return report
+    if outcome.stream.facilities:
+        report["optimization"] = outcome.stream.as_result(
+            outcome.status, outcome.optimality_gap
+        )
+    report["pareto_frontier"] = outcome.pareto_frontier
+    report["error"] = outcome.error
+    return report
+
+
+def run_reported(
+    scenario: Scenario, settings: OptimizationSettings | None
+) -> ScenarioReport:
+    try:
+        return run_scenario(scenario, settings)
+    except Exception as e:
+        logging.exception(f"Scenario {scenario.name} failed: {e}")
+        return error_report(scenario.name, str(e))
+
+
+def run_batch(
+    scenarios: Sequence[Any],
+    settings: OptimizationSettings | None = None,
+    workers: int = 0,
+    run: Callable[[Any, OptimizationSettings | None], ScenarioReport] = run_reported,
+) -> Iterator[ScenarioReport]:
+    """Reports in scenario order, one worker process per scenario at a time.
+
+    run turns each item of scenarios into its report in the worker; by
+    default the items are Scenarios. A failing scenario yields a report with
+    ``error`` set instead of stopping the batch. workers=0 runs everything in
+    this process.
+    """
+    if workers <= 0:
+        for scenario in scenarios:
+            yield run(scenario, settings)
+        return
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        yield from executor.map(run, scenarios, [settings] * len(scenarios))
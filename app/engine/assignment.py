@@ -0,0 +1,138 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from scipy.spatial import cKDTree
+from typing import Sequence
+
+REBUILD_FRACTION = 0.25
+MAX_REMOVED = 16
+MAX_CACHED_INDEXES = 256
+
+
+def unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+class FacilityIndex:
+    """Nearest-facility lookups over a KD-tree of 3D unit-sphere coordinates.
+
+    Chord length is monotonic in great-circle distance, so the Euclidean nearest
+    neighbour on the sphere is the haversine nearest facility. Facilities added
+    since the last build are scanned directly and removed ones are masked out;
+    the tree is rebuilt once those pending edits exceed REBUILD_FRACTION of it,
+    or MAX_REMOVED removals since each one widens every KD-tree query by one.
+    Not thread-safe by itself; shared indexes are used under ``lock``.
+    """
+
+    def __init__(self, facility_ids: Sequence[str], lat: np.ndarray, lon: np.ndarray):
+        self.lock = threading.Lock()
+        self._points = dict(zip(facility_ids, zip(map(float, lat), map(float, lon))))
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _rebuild(self):
+        self._tree_ids = np.array(list(self._points), dtype=object)
+        coords = np.array(list(self._points.values()), dtype=np.float64).reshape(-1, 2)
+        self._tree = cKDTree(unit_vectors(coords[:, 0], coords[:, 1]))
+        self._removed: set[str] = set()
+        self._added: dict[str, tuple[float, float]] = {}
+
+    def _maybe_rebuild(self):
+        pending = len(self._removed) + len(self._added)
+        if (
+            pending > REBUILD_FRACTION * max(len(self._tree_ids), 1)
+            or len(self._removed) > MAX_REMOVED
+        ):
+            self._rebuild()
+
+    def add(self, facility_id: str, lat: float, lon: float):
+        if facility_id in self._points:
+            self.remove(facility_id)
+        self._points[facility_id] = (lat, lon)
+        self._added[facility_id] = (lat, lon)
+        self._maybe_rebuild()
+
+    def remove(self, facility_id: str):
+        if self._points.pop(facility_id, None) is None:
+            return
+        if self._added.pop(facility_id, None) is None:
+            self._removed.add(facility_id)
+        self._maybe_rebuild()
+
+    def sync(self, facility_ids: Sequence[str], lat: np.ndarray, lon: np.ndarray):
+        current = dict(zip(facility_ids, zip(map(float, lat), map(float, lon))))
+        for facility_id in [f for f in self._points if f not in current]:
+            self.remove(facility_id)
+        for facility_id, (f_lat, f_lon) in current.items():
+            if self._points.get(facility_id) != (f_lat, f_lon):
+                self.add(facility_id, f_lat, f_lon)
+
+    def nearest(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        """Id of the nearest facility for each query point (None if empty)."""
+        queries = unit_vectors(lat, lon)
+        best_ids = np.full(len(queries), None, dtype=object)
+        best_dist = np.full(len(queries), np.inf)
+        if len(self._tree_ids) and len(queries):
+            k = min(len(self._removed) + 1, len(self._tree_ids))
+            dist, pos = self._tree.query(queries, k=k)
+            dist, pos = dist.reshape(len(queries), k), pos.reshape(len(queries), k)
+            if self._removed:
+                removed = np.isin(self._tree_ids, list(self._removed))
+                dist = np.where(removed[pos], np.inf, dist)
+            column = dist.argmin(axis=1)
+            rows = np.arange(len(queries))
+            best_dist = dist[rows, column]
+            best_ids = np.where(
+                np.isfinite(best_dist), self._tree_ids[pos[rows, column]], None
+            )
+        if self._added and len(queries):
+            added_ids = np.array(list(self._added), dtype=object)
+            added = np.array(list(self._added.values()), dtype=np.float64)
+            added_xyz = unit_vectors(added[:, 0], added[:, 1])
+            dist = np.linalg.norm(queries[:, None, :] - added_xyz[None, :, :], axis=2)
+            column = dist.argmin(axis=1)
+            added_best = dist[np.arange(len(queries)), column]
+            closer = added_best < best_dist
+            best_ids[closer] = added_ids[column[closer]]
+        return best_ids
+
+
+_INDEXES: OrderedDict[tuple[str, str], FacilityIndex] = OrderedDict()
+_INDEXES_LOCK = threading.Lock()
+
+
+def nearest_facility_ids(
+    network_key: str,
+    facility_type: str,
+    facility_ids: Sequence[str],
+    lat: np.ndarray,
+    lon: np.ndarray,
+    query_lat: np.ndarray,
+    query_lon: np.ndarray,
+) -> np.ndarray:
+    """Nearest of the given facilities to each query point, via the cached index.
+
+    The network's index is brought up to date with the facilities and queried
+    under its lock, so concurrent compiles of the same network never read a
+    tree another one is rebuilding, nor each other's facilities.
+    """
+    key = (network_key, facility_type)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        created = index is None
+        if created:
+            index = FacilityIndex(facility_ids, lat, lon)
+            _INDEXES[key] = index
+            while len(_INDEXES) > MAX_CACHED_INDEXES:
+                _INDEXES.popitem(last=False)
+        else:
+            _INDEXES.move_to_end(key)
+    with index.lock:
+        if not created:
+            index.sync(facility_ids, lat, lon)
+        return index.nearest(query_lat, query_lon)
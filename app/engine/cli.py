@@ -0,0 +1,122 @@
+"""Simulate (and optionally optimize) scenario directories without the web app.
+
+    python -m app.engine.cli scenarios/* --optimize "Greedy + Interchange" \
+        --num-dcs 8 --workers 8 --output results.jsonl
+
+Each scenario directory holds facilities.{csv,parquet}, demand.{csv,parquet},
+and optionally products.{csv,parquet} and config.json. A .jsonl output gets
+the full report per scenario, .csv or .parquet one summary row each.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Sequence
+import pandas as pd
+from app.engine.api import (
+    OptimizationSettings,
+    ScenarioReport,
+    error_report,
+    run_batch,
+    run_reported,
+)
+from app.engine.files import load_scenario
+from app.engine.optimization import OPTIMIZATION_MODES
+from app.engine.simulation import SERVICE_LEVEL_LABELS
+
+
+def run_directory(
+    directory: Path, settings: OptimizationSettings | None
+) -> ScenarioReport:
+    """Load and run one scenario directory in the worker.
+
+    A directory that fails to load gets an error report, so it does not
+    abort the rest of the batch.
+    """
+    try:
+        scenario = load_scenario(directory)
+    except Exception as e:
+        logging.exception(f"Failed to load scenario {directory}: {e}")
+        return error_report(directory.name, str(e))
+    return run_reported(scenario, settings)
+
+
+def summary_row(report: ScenarioReport) -> dict[str, Any]:
+    row: dict[str, Any] = {"scenario": report["name"], "error": report["error"]}
+    simulation = report["simulation"]
+    if simulation is not None:
+        row["total_cost"] = simulation["total_cost"]
+        row["inbound_cost"] = simulation["cost_breakdown"]["inbound"]
+        row["outbound_cost"] = simulation["cost_breakdown"]["outbound"]
+        row["total_demand_units"] = simulation["total_demand_units"]
+        for label in SERVICE_LEVEL_LABELS:
+            row[f"service_{label}_pct"] = simulation["service_levels"].get(label)
+    optimization = report["optimization"]
+    if optimization is not None:
+        row["optimized_cost"] = optimization["best_cost"]
+        row["cost_savings"] = optimization["cost_savings"]
+        row["service_penalty_cost"] = optimization["service_penalty_cost"]
+        row["optimization_status"] = optimization["status"]
+        row["optimal_facilities"] = ", ".join(optimization["optimal_facilities"])
+    return row
+
+
+def write_reports(path: Path, reports: Sequence[ScenarioReport]):
+    if path.suffix in (".jsonl", ".json"):
+        with path.open("w") as f:
+            for report in reports:
+                f.write(json.dumps(report) + "\n")
+        return
+    df = pd.DataFrame([summary_row(report) for report in reports])
+    if path.suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    elif path.suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output type: {path.name}")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.engine.cli",
+        description="Simulate and optimize network scenarios from CSV/Parquet files.",
+    )
+    parser.add_argument("scenarios", nargs="+", type=Path)
+    parser.add_argument("--output", type=Path, default=Path("results.jsonl"))
+    parser.add_argument("--optimize", choices=OPTIMIZATION_MODES)
+    parser.add_argument("--num-dcs", type=int, default=5)
+    parser.add_argument("--time-budget", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--service-penalty", type=float, default=0.0)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="scenarios run in parallel processes; 0 runs them in this process",
+    )
+    args = parser.parse_args(argv)
+    settings = None
+    if args.optimize:
+        settings = OptimizationSettings(
+            mode=args.optimize,
+            num_dcs=args.num_dcs,
+            time_budget=args.time_budget,
+            seed=args.seed,
+            service_penalty=args.service_penalty,
+        )
+    reports = []
+    for report in run_batch(
+        args.scenarios, settings, workers=args.workers, run=run_directory
+    ):
+        status = f"failed: {report['error']}" if report["error"] else "done"
+        print(f"{report['name']}: {status}", file=sys.stderr)
+        reports.append(report)
+    write_reports(args.output, reports)
+    return 1 if any(report["error"] for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+import json
+import uuid
+from pathlib import Path
+from typing import Any
+import pandas as pd
+from app.engine.api import Scenario
+from app.engine.ports import with_port_coordinates
+
+TABLE_SUFFIXES = (".parquet", ".csv")
+TEXT_COLUMNS = {
+    "facility_id": "",
+    "zip5": "",
+    "zip9": "",
+    "zip_code": "",
+    "demand_id": "",
+    "product_id": "",
+    "assigned_facility_id": "",
+}
+LOCK_STATUSES = ("none", "open", "closed")
+
+
+def read_table(path: Path) -> list[dict[str, Any]]:
+    """Rows of a CSV or Parquet file; ID and ZIP columns stay strings."""
+    if path.suffix == ".parquet":
+        df = pd.read_parquet(path)
+    elif path.suffix == ".csv":
+        df = pd.read_csv(path, dtype={column: str for column in TEXT_COLUMNS})
+    else:
+        raise ValueError(f"Unsupported file type: {path.name}")
+    for column in TEXT_COLUMNS.keys() & set(df.columns):
+        df[column] = df[column].where(df[column].notna(), "").astype(str)
+    return df.to_dict("records")
+
+
+def find_table(directory: Path, stem: str, required: bool = True) -> Path | None:
+    for suffix in TABLE_SUFFIXES:
+        path = directory / f"{stem}{suffix}"
+        if path.exists():
+            return path
+    if required:
+        raise FileNotFoundError(f"No {stem}.csv or {stem}.parquet in {directory}")
+    return None
+
+
+def facility_record(row: dict[str, Any]) -> dict[str, Any]:
+    """A facility row in the app's Facility shape, as the upload form reads it."""
+    types = row.get("facility_types")
+    if isinstance(types, str):
+        facility_types = [t.strip() for t in types.split(",") if t.strip()]
+    else:
+        facility_type = row.get("facility_type")
+        facility_types = [facility_type] if isinstance(facility_type, str) else []
+    lock_status = str(row.get("lock_status", "none")).lower()
+    is_active = row.get("is_active", True)
+    return {
+        "facility_id": row.get("facility_id") or str(uuid.uuid4()),
+        "facility_types": facility_types,
+        "site_name": str(row.get("site_name", "")),
+        "latitude": float(row["latitude"]),
+        "longitude": float(row["longitude"]),
+        "is_active": True if pd.isna(is_active) else bool(is_active),
+        "lock_status": lock_status if lock_status in LOCK_STATUSES else "none",
+    }
+
+
+def demand_record(i: int, row: dict[str, Any]) -> dict[str, Any]:
+    """A demand row in the app's Demand shape, keeping optional coordinates."""
+    record = {
+        "demand_id": row.get("demand_id") or str(i),
+        "zip_code": row["zip_code"],
+        "product_id": row.get("product_id", ""),
+        "units_demanded": int(row["units_demanded"]),
+        "assigned_facility_id": row.get("assigned_facility_id", ""),
+    }
+    if not pd.isna(row.get("latitude")) and not pd.isna(row.get("longitude")):
+        record["latitude"] = float(row["latitude"])
+        record["longitude"] = float(row["longitude"])
+    return record
+
+
+def load_scenario(directory: Path) -> Scenario:
+    """A scenario directory: facilities and demand tables, optional products and config.json.
+
+    config.json may hold transport_costs, edge_overrides, inbound_sources and
+    candidate_facility_type in the app's shapes. Inbound sources without
+    coordinates get them from the port list, as saved sessions do. Without
+    inbound_sources the engine supplies every facility from its fallback port.
+    """
+    config: dict[str, Any] = {}
+    if (directory / "config.json").exists():
+        config = json.loads((directory / "config.json").read_text())
+    products_path = find_table(directory, "products", required=False)
+    return Scenario(
+        name=directory.name,
+        facilities=[
+            facility_record(row)
+            for row in read_table(find_table(directory, "facilities"))
+        ],
+        demands=[
+            demand_record(i, row)
+            for i, row in enumerate(read_table(find_table(directory, "demand")))
+        ],
+        products=read_table(products_path) if products_path else [],
+        transport_costs=config.get("transport_costs", []),
+        edge_overrides=config.get("edge_overrides", []),
+        inbound_sources=with_port_coordinates(config.get("inbound_sources", [])),
+        candidate_facility_type=config.get("candidate_facility_type", "DC"),
+    )
@@ -0,0 +1,30 @@
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.8
+
+
+def haversine_pairs(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Great-circle miles between matching points of two broadcastable point sets."""
+    lat1 = np.radians(np.asarray(lat1, dtype=np.float64))
+    lon1 = np.radians(np.asarray(lon1, dtype=np.float64))
+    lat2 = np.radians(np.asarray(lat2, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lon2, dtype=np.float64))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Great-circle miles between every point of set 1 (rows) and set 2 (columns)."""
+    return haversine_pairs(
+        np.asarray(lat1)[:, None],
+        np.asarray(lon1)[:, None],
+        np.asarray(lat2)[None, :],
+        np.asarray(lon2)[None, :],
+    )
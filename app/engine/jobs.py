@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Hashable, Sequence
+from app.engine.pool import new_shared_event, new_shared_queue
+
+_jobs: dict[Hashable, Any] = {}
+_jobs_lock = threading.Lock()
+
+
+def start_job(job_key: Hashable) -> Any:
+    """Register a cancel event for the job; workers poll it via is_set().
+
+    Key jobs by session and kind, so one session's simulation and
+    optimization never share (or finish away) each other's event.
+    """
+    event = new_shared_event()
+    with _jobs_lock:
+        _jobs[job_key] = event
+    return event
+
+
+def cancel_job(job_key: Hashable) -> bool:
+    with _jobs_lock:
+        event = _jobs.get(job_key)
+    if event is None:
+        return False
+    event.set()
+    return True
+
+
+def finish_job(job_key: Hashable):
+    with _jobs_lock:
+        _jobs.pop(job_key, None)
+
+
+class SearchStopped(Exception):
+    """A search's control stopped it before it had a matrix to search."""
+
+
+@dataclass(frozen=True)
+class SearchControl:
+    """Handed to optimizer workers: when to stop, and where to report incumbents.
+
+    ``deadline`` is wall-clock (time.time()) so it means the same thing in
+    every worker process. ``candidates`` maps the column positions a search
+    works in back to facility indices for reports.
+    """
+
+    cancel_event: Any
+    deadline: float | None = None
+    reports: Any = None
+    candidates: Any = None
+
+    @classmethod
+    def start(cls, cancel_event: Any, time_budget: float = 0.0) -> "SearchControl":
+        return cls(
+            cancel_event,
+            deadline=time.time() + time_budget if time_budget > 0 else None,
+            reports=new_shared_queue(),
+        )
+
+    @classmethod
+    def local(cls, time_budget: float = 0.0) -> "SearchControl":
+        """For a search run in this process: only the time budget stops it."""
+        return cls(
+            threading.Event(),
+            deadline=time.time() + time_budget if time_budget > 0 else None,
+        )
+
+    def for_candidates(self, candidates: Any) -> "SearchControl":
+        return replace(self, candidates=candidates)
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.time() >= self.deadline
+
+    def stopped(self) -> bool:
+        return self.cancel_event.is_set() or self.expired
+
+    def remaining(self) -> float | None:
+        return None if self.deadline is None else max(self.deadline - time.time(), 0.0)
+
+    def report(self, cost: float, selection: Sequence[int]):
+        if self.reports is None:
+            return
+        if self.candidates is not None:
+            selection = [self.candidates[j] for j in selection]
+        self.reports.put((float(cost), sorted(int(j) for j in selection)))
+
+    def drain(self) -> list[tuple[float, list[int]]]:
+        reports = []
+        while self.reports is not None:
+            try:
+                reports.append(self.reports.get_nowait())
+            except queue.Empty:
+                break
+        return reports
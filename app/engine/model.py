@@ -0,0 +1,240 @@
+import hashlib
+import numpy as np
+from dataclasses import dataclass, fields, replace
+from types import MappingProxyType
+from typing import Any, Collection, Mapping, Sequence
+from app.engine.assignment import nearest_facility_ids
+from app.engine.zip_index import resolve_zip_codes
+
+DEFAULT_MODE_COSTS = {"Parcel": 0.5, "LTL": 2.0, "TL": 3.0}
+INBOUND_SOURCE_TYPES = ("Port", "Source Warehouse", "Factory")
+
+
+def _frozen(values: Sequence[Any], dtype: Any) -> np.ndarray:
+    array = np.array(values, dtype=dtype)
+    array.setflags(write=False)
+    return array
+
+
+MAPPING_FIELDS = ("facility_index", "mode_costs", "edge_overrides")
+
+
+@dataclass(frozen=True)
+class NetworkModel:
+    network_key: str
+    facility_ids: tuple[str, ...]
+    facility_names: tuple[str, ...]
+    facility_types: tuple[tuple[str, ...], ...]
+    facility_index: Mapping[str, int]
+    facility_lat: np.ndarray
+    facility_lon: np.ndarray
+    facility_active: np.ndarray
+    facility_lock: tuple[str, ...]
+    source_node_ids: tuple[str, ...]
+    source_names: tuple[str, ...]
+    source_lat: np.ndarray
+    source_lon: np.ndarray
+    demand_ids: tuple[str, ...]
+    demand_units: np.ndarray
+    demand_lat: np.ndarray
+    demand_lon: np.ndarray
+    demand_facility: np.ndarray
+    demand_product: np.ndarray
+    product_ids: tuple[str, ...]
+    product_weight: np.ndarray
+    product_cube: np.ndarray
+    mode_costs: Mapping[str, float]
+    edge_overrides: Mapping[tuple[str, str], float]
+    service_penalty: float = 0.0
+    fixed_open: tuple[int, ...] = ()
+
+    def __post_init__(self) -> None:
+        # Models are shared across requests and cached by fingerprint, so the
+        # lookup tables are read-only like the arrays.
+        for name in MAPPING_FIELDS:
+            value = getattr(self, name)
+            if not isinstance(value, MappingProxyType):
+                object.__setattr__(self, name, MappingProxyType(dict(value)))
+
+    def __reduce__(self):
+        # Mapping proxies do not pickle; pool workers get plain dicts that
+        # __post_init__ wraps again.
+        values = [getattr(self, f.name) for f in fields(self)]
+        return NetworkModel, tuple(
+            dict(v) if isinstance(v, MappingProxyType) else v for v in values
+        )
+
+    @property
+    def num_facilities(self) -> int:
+        return len(self.facility_ids)
+
+    @property
+    def num_demands(self) -> int:
+        return len(self.demand_ids)
+
+    @property
+    def num_sources(self) -> int:
+        return len(self.source_node_ids)
+
+    def fingerprint(self, exclude: Collection[str] = ()) -> str:
+        """Content hash of everything that affects costs (not the network key)."""
+        digest = hashlib.blake2b(digest_size=16)
+        for field in fields(self):
+            if field.name in ("network_key", "facility_index") or field.name in exclude:
+                continue
+            value = getattr(self, field.name)
+            if isinstance(value, np.ndarray):
+                digest.update(value.dtype.str.encode())
+                digest.update(np.ascontiguousarray(value).tobytes())
+            elif isinstance(value, Mapping):
+                digest.update(repr(sorted(value.items())).encode())
+            else:
+                digest.update(repr(value).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def demand_slice(self, start: int, stop: int) -> "NetworkModel":
+        return replace(
+            self,
+            demand_ids=self.demand_ids[start:stop],
+            demand_units=self.demand_units[start:stop],
+            demand_lat=self.demand_lat[start:stop],
+            demand_lon=self.demand_lon[start:stop],
+            demand_facility=self.demand_facility[start:stop],
+            demand_product=self.demand_product[start:stop],
+        )
+
+    def inbound_rate_overrides(self) -> np.ndarray:
+        """Edge-override rate of each inbound lane; NaN where the TL rate applies."""
+        if not self.edge_overrides:
+            return np.full((self.num_facilities, self.num_sources), np.nan)
+        source_index = {node: s for s, node in enumerate(self.source_node_ids)}
+        node_index = {
+            f"{facility_id}_{facility_type}": i
+            for i, (facility_id, types) in enumerate(
+                zip(self.facility_ids, self.facility_types)
+            )
+            for facility_type in types
+        }
+        overridden = np.full((self.num_facilities, self.num_sources), np.inf)
+        for (from_node, to_node), cost_per_mile in self.edge_overrides.items():
+            s = source_index.get(from_node)
+            i = node_index.get(to_node, self.facility_index.get(to_node))
+            if s is not None and i is not None:
+                overridden[i, s] = min(overridden[i, s], cost_per_mile)
+        return np.where(np.isfinite(overridden), overridden, np.nan)
+
+    def facilities_of_type(self, facility_type: str) -> np.ndarray:
+        return np.array(
+            [
+                i
+                for i, types in enumerate(self.facility_types)
+                if facility_type in types
+            ],
+            dtype=np.int64,
+        )
+
+
+def mode_cost_table(transport_costs: Sequence[Mapping[str, Any]]) -> dict[str, float]:
+    """Per-mile rate of every mode; the first entry for a mode wins."""
+    mode_costs = dict(DEFAULT_MODE_COSTS)
+    for cost in reversed(transport_costs):
+        mode_costs[cost["mode"]] = cost["cost_per_mile"]
+    return mode_costs
+
+
+def demand_coordinates(
+    demands: Sequence[Mapping[str, Any]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """A demand's own latitude/longitude where it has both, else its ZIP centroid."""
+    lat, lon = resolve_zip_codes([d["zip_code"] for d in demands])
+    own_lat = np.array([d.get("latitude") for d in demands], dtype=np.float64)
+    own_lon = np.array([d.get("longitude") for d in demands], dtype=np.float64)
+    located = ~np.isnan(own_lat) & ~np.isnan(own_lon)
+    return np.where(located, own_lat, lat), np.where(located, own_lon, lon)
+
+
+def compile_network(
+    facilities: Sequence[Mapping[str, Any]],
+    demands: Sequence[Mapping[str, Any]],
+    products: Sequence[Mapping[str, Any]],
+    transport_costs: Sequence[Mapping[str, Any]],
+    edge_overrides: Sequence[Mapping[str, Any]] = (),
+    inbound_sources: Sequence[Mapping[str, Any]] = (),
+    network_key: str = "",
+    assign_facility_type: str | None = None,
+    service_penalty: float = 0.0,
+) -> NetworkModel:
+    facility_index = {f["facility_id"]: i for i, f in enumerate(facilities)}
+    product_index = {p["product_id"]: i for i, p in enumerate(products)}
+    demand_lat, demand_lon = demand_coordinates(demands)
+    facility_lat = _frozen([f["latitude"] for f in facilities], np.float64)
+    facility_lon = _frozen([f["longitude"] for f in facilities], np.float64)
+    demand_facility = np.array(
+        [facility_index.get(d["assigned_facility_id"], -1) for d in demands],
+        dtype=np.int64,
+    )
+    if assign_facility_type is not None:
+        unassigned = (demand_facility < 0) & ~np.isnan(demand_lat)
+        eligible = [
+            i
+            for i, f in enumerate(facilities)
+            if f["is_active"] and assign_facility_type in f.get("facility_types", [])
+        ]
+        if unassigned.any() and eligible:
+            nearest_ids = nearest_facility_ids(
+                network_key,
+                assign_facility_type,
+                [facilities[i]["facility_id"] for i in eligible],
+                facility_lat[eligible],
+                facility_lon[eligible],
+                demand_lat[unassigned],
+                demand_lon[unassigned],
+            )
+            demand_facility[unassigned] = [facility_index[f] for f in nearest_ids]
+    demand_facility.setflags(write=False)
+    sources = [
+        (f"{f['facility_id']}_{t}", f["site_name"], f["latitude"], f["longitude"])
+        for f in facilities
+        if f["is_active"]
+        for t in f.get("facility_types", [])
+        if t in INBOUND_SOURCE_TYPES
+    ] + [
+        (s["source_id"], s["name"], s["latitude"], s["longitude"])
+        for s in inbound_sources
+        if s.get("latitude") is not None and s.get("longitude") is not None
+    ]
+    demand_lat.setflags(write=False)
+    demand_lon.setflags(write=False)
+    return NetworkModel(
+        network_key=network_key,
+        facility_ids=tuple(f["facility_id"] for f in facilities),
+        facility_names=tuple(f["site_name"] for f in facilities),
+        facility_types=tuple(tuple(f.get("facility_types", [])) for f in facilities),
+        facility_index=facility_index,
+        facility_lat=facility_lat,
+        facility_lon=facility_lon,
+        facility_active=_frozen([f["is_active"] for f in facilities], bool),
+        facility_lock=tuple(f.get("lock_status", "none") for f in facilities),
+        source_node_ids=tuple(s[0] for s in sources),
+        source_names=tuple(s[1] for s in sources),
+        source_lat=_frozen([s[2] for s in sources], np.float64),
+        source_lon=_frozen([s[3] for s in sources], np.float64),
+        demand_ids=tuple(d["demand_id"] for d in demands),
+        demand_units=_frozen([d["units_demanded"] for d in demands], np.float64),
+        demand_lat=demand_lat,
+        demand_lon=demand_lon,
+        demand_facility=demand_facility,
+        demand_product=_frozen(
+            [product_index.get(d["product_id"], -1) for d in demands], np.int64
+        ),
+        product_ids=tuple(p["product_id"] for p in products),
+        product_weight=_frozen([p["weight_per_unit"] for p in products], np.float64),
+        product_cube=_frozen([p["cube_per_unit"] for p in products], np.float64),
+        mode_costs=mode_cost_table(transport_costs),
+        edge_overrides={
+            (e["from_node_id"], e["to_node_id"]): e["cost_per_mile"]
+            for e in edge_overrides
+        },
+        service_penalty=service_penalty,
+    )
@@ -0,0 +1,960 @@
+import hashlib
+import math
+import os
+import time
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+from dataclasses import dataclass, field, replace
+from typing import Callable, Iterator, NamedTuple, Sequence, TypedDict
+from app.engine.geo import haversine_matrix
+from app.engine.jobs import SearchControl, SearchStopped
+from app.engine.model import NetworkModel
+from app.engine.progress import ProgressPublisher
+from app.engine.shared_matrix import SharedMatrix, as_array
+from app.engine.simulation import (
+    DEFAULT_OUTBOUND_MILES,
+    SERVICE_LEVEL_MAX_MILES,
+    inbound_legs,
+)
+
+GREEDY_INTERCHANGE = "Greedy + Interchange"
+BRUTE_FORCE = "Brute Force"
+EXACT_MILP = "Exact (MILP)"
+BRANCH_AND_BOUND = "Branch and Bound"
+GENETIC = "Genetic Algorithm"
+PARETO_FRONTIER = "Pareto Frontier"
+OPTIMIZATION_MODES = [
+    GREEDY_INTERCHANGE,
+    EXACT_MILP,
+    BRANCH_AND_BOUND,
+    GENETIC,
+    PARETO_FRONTIER,
+    BRUTE_FORCE,
+]
+DEFAULT_PARETO_PENALTIES = "0, 25, 100, 400"
+MILP_TIME_LIMIT_SECONDS = float(os.environ.get("MILP_TIME_LIMIT_SECONDS", 600))
+OPTIMIZATION_BATCH_SIZE = 20_000
+CHECKPOINT_INTERVAL_SECONDS = float(os.environ.get("CHECKPOINT_INTERVAL_SECONDS", 30))
+BRUTE_FORCE_MAX_COMBINATIONS = int(
+    os.environ.get("BRUTE_FORCE_MAX_COMBINATIONS", 5_000_000)
+)
+EVALUATION_BLOCK_BYTES = 32 * 1024**2
+GA_POPULATION_SIZE = 200
+GA_GENERATIONS = 300
+GA_MUTATION_RATE = 0.3
+GA_STALL_GENERATIONS = 50
+IMPROVEMENT_TOLERANCE = 1e-9
+CANCEL_CHECK_INTERVAL = 256
+MILP_STATUSES = {0: "optimal", 1: "time_limit", 2: "infeasible", 3: "unbounded"}
+
+
+class OptimizationResult(TypedDict):
+    optimal_facilities: list[str]
+    best_cost: float
+    baseline_cost: float
+    cost_savings: float
+    service_penalty_cost: float
+    status: str
+    solve_seconds: float
+    optimality_gap: float | None
+
+
+@dataclass
+class IncumbentStream:
+    """Best selection a run has seen so far, as reported by its workers.
+
+    Lives in the main process; ``publisher`` decides when the incumbent and
+    progress are worth pushing to the client. ``best_cost`` is the search
+    objective; with a service penalty, ``price`` gives a selection's
+    transport cost for reporting (baseline_cost is already transport cost).
+    """
+
+    facility_names: tuple[str, ...]
+    baseline_cost: float
+    best_cost: float = math.inf
+    facilities: list[int] = field(default_factory=list)
+    fixed_open: tuple[int, ...] = ()
+    started: float = field(default_factory=time.perf_counter)
+    publisher: ProgressPublisher = field(default_factory=ProgressPublisher)
+    price: Callable[[Sequence[int]], float] | None = None
+    _priced: tuple[tuple[int, ...], float] | None = field(default=None, repr=False)
+
+    def offer(self, cost: float, facilities: Sequence[int] | None) -> bool:
+        """Keep the cheaper selection; on a tie the lexicographically smaller one.
+
+        Candidates are in ascending facility order, so the tie rule picks the
+        lowest-ranked combination whatever order the workers report in.
+        """
+        if not facilities or cost > self.best_cost:
+            return False
+        selection = sorted(int(j) for j in facilities)
+        if cost == self.best_cost and selection >= self.facilities:
+            return False
+        self.best_cost = cost
+        self.facilities = selection
+        return True
+
+    def should_publish(self, progress: float) -> bool:
+        return self.publisher.should_publish(progress, self.best_cost)
+
+    def transport_cost(self, selection: tuple[int, ...]) -> float:
+        if self.price is None:
+            return self.best_cost
+        if self._priced is None or self._priced[0] != selection:
+            self._priced = (selection, self.price(selection))
+        return self._priced[1]
+
+    def as_result(
+        self, status: str, optimality_gap: float | None = None
+    ) -> OptimizationResult:
+        selection = tuple(sorted((*self.fixed_open, *self.facilities)))
+        best_cost = self.transport_cost(selection)
+        return {
+            "optimal_facilities": [self.facility_names[j] for j in selection],
+            "best_cost": best_cost,
+            "baseline_cost": self.baseline_cost,
+            "cost_savings": self.baseline_cost - best_cost,
+            "service_penalty_cost": self.best_cost - best_cost,
+            "status": status,
+            "solve_seconds": time.perf_counter() - self.started,
+            "optimality_gap": optimality_gap,
+        }
+
+
+def outbound_miles_matrix(
+    model: NetworkModel,
+    candidates: np.ndarray,
+    lat: np.ndarray | None = None,
+    lon: np.ndarray | None = None,
+) -> np.ndarray:
+    """Miles from each point (rows; the model's demands by default) to each site."""
+    if lat is None or lon is None:
+        lat, lon = model.demand_lat, model.demand_lon
+    miles = haversine_matrix(
+        lat, lon, model.facility_lat[candidates], model.facility_lon[candidates]
+    )
+    return np.where(np.isnan(miles), DEFAULT_OUTBOUND_MILES, miles)
+
+
+def points_digest(lat: np.ndarray, lon: np.ndarray) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(lat, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(lon, dtype=np.float64).tobytes())
+    return digest.digest()
+
+
+def demand_locations(model: NetworkModel) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Distinct demand coordinates and the units demanded at each.
+
+    Demands at one location cost the same per unit from every site, so the
+    cost matrix needs only one row per location. Unresolved demands share a
+    row at NaN, which prices at the default outbound leg.
+    """
+    location = np.column_stack(
+        (
+            np.nan_to_num(model.demand_lat, nan=np.inf),
+            np.nan_to_num(model.demand_lon, nan=np.inf),
+        )
+    )
+    unique, group = np.unique(location, axis=0, return_inverse=True)
+    units = np.bincount(
+        group.ravel(), weights=model.demand_units, minlength=len(unique)
+    )
+    unique[np.isinf(unique)] = np.nan
+    return unique[:, 0], unique[:, 1], units
+
+
+def cost_matrix_keys(
+    model: NetworkModel, columns: np.ndarray
+) -> tuple[tuple, list[tuple]]:
+    """What the rows and each column of cost_columns depend on.
+
+    A matrix built for the same demand key can reuse every column whose key
+    is unchanged.
+    """
+    inbound_cost = inbound_legs(model).cost_per_unit
+    demand_key = (
+        points_digest(model.demand_lat, model.demand_lon),
+        points_digest(model.demand_units, model.demand_units),
+        model.mode_costs["Parcel"],
+        model.service_penalty,
+    )
+    column_keys = [
+        (
+            model.facility_ids[j],
+            float(model.facility_lat[j]),
+            float(model.facility_lon[j]),
+            float(inbound_cost[j]),
+        )
+        for j in columns
+    ]
+    return demand_key, column_keys
+
+
+def cost_columns(
+    model: NetworkModel,
+    columns: np.ndarray,
+    control: SearchControl | None = None,
+) -> np.ndarray:
+    """Cost of serving each demand location (rows) from each site in columns.
+
+    Built in column blocks; with a control, raises SearchStopped between
+    blocks once it is cancelled or past its deadline.
+    """
+    columns = np.asarray(columns, dtype=np.int64)
+    inbound_cost = inbound_legs(model).cost_per_unit
+    lat, lon, units = demand_locations(model)
+    cost = np.empty((len(lat), len(columns)), dtype=np.float64)
+    block = max(EVALUATION_BLOCK_BYTES // (len(lat) * 8 or 1), 1)
+    for start in range(0, len(columns), block):
+        if control is not None and control.stopped():
+            raise SearchStopped()
+        block_columns = columns[start : start + block]
+        outbound_miles = outbound_miles_matrix(model, block_columns, lat, lon)
+        unit_cost = (
+            inbound_cost[block_columns][None, :]
+            + outbound_miles * model.mode_costs["Parcel"]
+        )
+        if model.service_penalty:
+            unit_cost += model.service_penalty * (
+                outbound_miles > SERVICE_LEVEL_MAX_MILES[0]
+            )
+        cost[:, start : start + block] = unit_cost * units[:, None]
+    return cost
+
+
+def problem_columns(
+    model: NetworkModel, candidates: np.ndarray, facility_type: str
+) -> np.ndarray:
+    """Candidates, then the sites pinned open, then the other active sites of the type.
+
+    One cost_columns matrix over these gives both the search matrix
+    (with_fixed_open) and the baseline (every active site open).
+    """
+    candidates = np.asarray(candidates, dtype=np.int64)
+    fixed_open = np.asarray(model.fixed_open, dtype=np.int64)
+    sites = model.facilities_of_type(facility_type)
+    sites = sites[model.facility_active[sites]]
+    others = np.setdiff1d(sites, np.concatenate((candidates, fixed_open)))
+    return np.concatenate((candidates, fixed_open, others))
+
+
+def with_fixed_open(
+    raw: np.ndarray, num_candidates: int, num_fixed: int, out: np.ndarray | None = None
+) -> np.ndarray:
+    """The candidate columns of raw, each capped at the location's cheapest pinned site.
+
+    The pinned sites are the num_fixed columns after the candidates, so
+    solvers only choose the additional sites.
+    """
+    if not num_fixed:
+        return raw[:, :num_candidates]
+    floor = raw[:, num_candidates : num_candidates + num_fixed].min(
+        axis=1, keepdims=True
+    )
+    return np.minimum(raw[:, :num_candidates], floor, out=out)
+
+
+def all_open_cost(raw: np.ndarray) -> float:
+    """Total cost with every column of a cost_columns matrix open."""
+    return float(raw.min(axis=1).sum()) if raw.shape[1] else math.inf
+
+
+def transport_cost(model: NetworkModel, facilities: Sequence[int]) -> float:
+    """Cost of serving the demand from facilities, without the service penalty.
+
+    Each location goes to the site the search would pick for it, the cheapest
+    once the next-day penalty is added, but only its transport cost counts.
+    """
+    selected = np.asarray(facilities, dtype=np.int64)
+    if not len(selected):
+        return math.inf
+    inbound_cost = inbound_legs(model).cost_per_unit[selected]
+    lat, lon, units = demand_locations(model)
+    block = max(EVALUATION_BLOCK_BYTES // (len(selected) * 8), 1)
+    total = 0.0
+    for start in range(0, len(lat), block):
+        rows = slice(start, start + block)
+        miles = outbound_miles_matrix(model, selected, lat[rows], lon[rows])
+        unit_cost = inbound_cost[None, :] + miles * model.mode_costs["Parcel"]
+        chosen = (
+            unit_cost + model.service_penalty * (miles > SERVICE_LEVEL_MAX_MILES[0])
+        ).argmin(axis=1)
+        total += float(unit_cost[np.arange(len(chosen)), chosen] @ units[rows])
+    return total
+
+
+def baseline_cost(model: NetworkModel, columns: np.ndarray, raw: np.ndarray) -> float:
+    """Transport cost of the network with every column of raw open."""
+    if not model.service_penalty:
+        return all_open_cost(raw)
+    return transport_cost(model, columns)
+
+
+def search_cost(cost: np.ndarray | SharedMatrix, candidates: np.ndarray) -> np.ndarray:
+    """The candidate columns of a search matrix, attaching to it if it is shared.
+
+    A search matrix is with_fixed_open over the cost_columns of
+    problem_columns: one row per demand location, one column per candidate.
+    """
+    return as_array(cost)[:, : len(candidates)]
+
+
+def optimization_candidates(
+    model: NetworkModel, facility_type: str
+) -> tuple[NetworkModel, np.ndarray]:
+    """Active sites of the type, with the lock constraints applied."""
+    candidates = model.facilities_of_type(facility_type)
+    return constrain_candidates(model, candidates[model.facility_active[candidates]])
+
+
+def constrain_candidates(
+    model: NetworkModel, candidates: np.ndarray
+) -> tuple[NetworkModel, np.ndarray]:
+    """Pin locked-open candidates in the model; drop every locked one from the search."""
+    locks = np.array([model.facility_lock[j] for j in candidates], dtype=object)
+    fixed_open = tuple(int(j) for j in candidates[locks == "open"])
+    return replace(model, fixed_open=fixed_open), candidates[locks == "none"]
+
+
+def population_costs(
+    cost: np.ndarray, population: np.ndarray, fixed_costs: np.ndarray | None = None
+) -> np.ndarray:
+    """Total cost of every row of site columns in population, in array blocks."""
+    population = np.asarray(population, dtype=np.int64)
+    width = population.shape[1] if population.ndim == 2 else 1
+    block = max(EVALUATION_BLOCK_BYTES // (len(cost) * 8 * width or 1), 1)
+    totals = np.concatenate(
+        [
+            cost[:, population[start : start + block]].min(axis=2).sum(axis=0)
+            for start in range(0, len(population), block)
+        ]
+        or [np.zeros(0)]
+    )
+    if fixed_costs is not None:
+        totals += np.asarray(fixed_costs)[population].sum(axis=1)
+    return totals
+
+
+def selection_cost(cost: np.ndarray, selection: Sequence[int]) -> float:
+    return float(cost[:, list(selection)].min(axis=1).sum())
+
+
+def _two_cheapest(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Column of the cheapest and runner-up entry per row (-1 if only one column)."""
+    if cost.shape[1] == 1:
+        return np.zeros(len(cost), dtype=np.int64), np.full(len(cost), -1)
+    order = np.argpartition(cost, 1, axis=1)
+    return order[:, 0], order[:, 1]
+
+
+class DeltaEvaluator:
+    """Per-demand cheapest and runner-up open site, kept current one move at a time.
+
+    Opening or closing a site only touches the demand rows whose best or
+    runner-up changes; ``close_loss`` holds the cost of closing each open site.
+    """
+
+    def __init__(self, cost: np.ndarray, selection: Sequence[int]):
+        self.cost = cost
+        self.rows = np.arange(len(cost))
+        self.is_open = np.zeros(cost.shape[1], dtype=bool)
+        self.is_open[list(selection)] = True
+        self.best_col = np.zeros(len(cost), dtype=np.int64)
+        self.second_col = np.full(len(cost), -1)
+        self.best = np.zeros(len(cost))
+        self.second = np.full(len(cost), np.inf)
+        self.close_loss = np.zeros(cost.shape[1])
+        self.sole_site = np.zeros(cost.shape[1], dtype=np.int64)
+        self._reassign(self.rows)
+        self._account(self.rows, 1)
+        self.total = float(self.best.sum())
+
+    @property
+    def selection(self) -> list[int]:
+        return np.flatnonzero(self.is_open).tolist()
+
+    def _reassign(self, rows: np.ndarray):
+        open_columns = np.flatnonzero(self.is_open)
+        sub_best, sub_second = _two_cheapest(self.cost[np.ix_(rows, open_columns)])
+        self.best_col[rows] = open_columns[sub_best]
+        self.second_col[rows] = np.where(
+            sub_second >= 0, open_columns[np.maximum(sub_second, 0)], -1
+        )
+        self.best[rows] = self.cost[rows, self.best_col[rows]]
+        self.second[rows] = np.where(
+            self.second_col[rows] >= 0,
+            self.cost[rows, np.maximum(self.second_col[rows], 0)],
+            np.inf,
+        )
+
+    def _account(self, rows: np.ndarray, sign: int):
+        columns = self.best_col[rows]
+        gap = self.second[rows] - self.best[rows]
+        sole = np.isinf(gap)
+        np.add.at(self.close_loss, columns[~sole], sign * gap[~sole])
+        np.add.at(self.sole_site, columns[sole], sign)
+
+    def open_delta(self, j: int) -> float:
+        return float(np.minimum(self.cost[:, j] - self.best, 0).sum())
+
+    def close_delta(self, j: int) -> float:
+        return np.inf if self.sole_site[j] else float(self.close_loss[j])
+
+    def swap_totals(self, i: int) -> np.ndarray:
+        """Total cost after opening closed site i and closing each column."""
+        with_i = np.minimum(self.best, self.cost[:, i])
+        totals = with_i.sum() + np.bincount(
+            self.best_col,
+            weights=np.minimum(self.second, self.cost[:, i]) - with_i,
+            minlength=self.cost.shape[1],
+        )
+        totals[~self.is_open] = np.inf
+        return totals
+
+    def open(self, j: int):
+        column = self.cost[:, j]
+        rows = np.flatnonzero(column < self.second)
+        self._account(rows, -1)
+        self.total -= float(self.best[rows].sum())
+        takes_best = column[rows] < self.best[rows]
+        self.second[rows] = np.where(takes_best, self.best[rows], column[rows])
+        self.second_col[rows] = np.where(takes_best, self.best_col[rows], j)
+        self.best[rows] = np.where(takes_best, column[rows], self.best[rows])
+        self.best_col[rows] = np.where(takes_best, j, self.best_col[rows])
+        self.is_open[j] = True
+        self._account(rows, 1)
+        self.total += float(self.best[rows].sum())
+
+    def close(self, j: int):
+        rows = np.flatnonzero((self.best_col == j) | (self.second_col == j))
+        self._account(rows, -1)
+        self.total -= float(self.best[rows].sum())
+        self.is_open[j] = False
+        self._reassign(rows)
+        self._account(rows, 1)
+        self.total += float(self.best[rows].sum())
+
+
+def greedy_add(cost: np.ndarray, p: int) -> list[int]:
+    selection = [int(cost.sum(axis=0).argmin())]
+    best = cost[:, selection[0]].copy()
+    savings = np.maximum(best[:, None] - cost, 0).sum(axis=0)
+    while len(selection) < p:
+        savings[selection] = -np.inf
+        j = int(savings.argmax())
+        selection.append(j)
+        rows = np.flatnonzero(cost[:, j] < best)
+        sub = cost[rows]
+        savings -= (
+            np.maximum(best[rows, None] - sub, 0)
+            - np.maximum(cost[rows, j, None] - sub, 0)
+        ).sum(axis=0)
+        best[rows] = cost[rows, j]
+    return selection
+
+
+def greedy_drop(cost: np.ndarray, p: int) -> list[int]:
+    evaluator = DeltaEvaluator(cost, range(cost.shape[1]))
+    while evaluator.is_open.sum() > max(p, 1):
+        loss = np.where(
+            evaluator.is_open & (evaluator.sole_site == 0), evaluator.close_loss, np.inf
+        )
+        evaluator.close(int(loss.argmin()))
+    return evaluator.selection
+
+
+def fit_selection(cost: np.ndarray, selection: Sequence[int], p: int) -> list[int]:
+    """Grow or shrink a previous selection to p sites greedily; build one if empty."""
+    if not len(selection):
+        return greedy_add(cost, p) if p <= cost.shape[1] // 2 else greedy_drop(cost, p)
+    evaluator = DeltaEvaluator(cost, selection)
+    while evaluator.is_open.sum() > p:
+        loss = np.where(
+            evaluator.is_open & (evaluator.sole_site == 0), evaluator.close_loss, np.inf
+        )
+        evaluator.close(int(loss.argmin()))
+    while evaluator.is_open.sum() < p:
+        gain = np.minimum(cost - evaluator.best[:, None], 0).sum(axis=0)
+        gain[evaluator.is_open] = np.inf
+        evaluator.open(int(gain.argmin()))
+    return evaluator.selection
+
+
+def interchange(
+    cost: np.ndarray, selection: Sequence[int], control: SearchControl | None = None
+) -> tuple[list[int], float]:
+    """Teitz-Bart vertex substitution until no single swap lowers the cost."""
+    evaluator = DeltaEvaluator(cost, selection)
+    if control is not None:
+        control.report(evaluator.total, evaluator.selection)
+    improved = True
+    while improved:
+        improved = False
+        for i in np.flatnonzero(~evaluator.is_open):
+            if control is not None and control.stopped():
+                return evaluator.selection, evaluator.total
+            swap_totals = evaluator.swap_totals(i)
+            out = int(swap_totals.argmin())
+            total = evaluator.total
+            if swap_totals[out] < total - IMPROVEMENT_TOLERANCE * max(abs(total), 1):
+                evaluator.open(i)
+                evaluator.close(out)
+                improved = True
+                if control is not None:
+                    control.report(evaluator.total, evaluator.selection)
+    return evaluator.selection, evaluator.total
+
+
+def solve_greedy_interchange(
+    cost: np.ndarray | SharedMatrix,
+    candidates: np.ndarray,
+    p: int,
+    control: SearchControl | None = None,
+    warm_start: Sequence[int] = (),
+) -> tuple[float, list[int]]:
+    """Greedy start, then interchange, on the search matrix of the candidates.
+
+    warm_start holds candidate positions of a previous solution to start from.
+    """
+    cost = search_cost(cost, candidates)
+    start = fit_selection(cost, warm_start, p)
+    if control is not None:
+        control = control.for_candidates(candidates)
+    selection, total = interchange(cost, start, control)
+    return total, sorted(int(candidates[j]) for j in selection)
+
+
+def unrank_combination(rank: int, n: int, k: int) -> list[int]:
+    """The k-combination of range(n) at this lexicographic rank."""
+    combination = []
+    x = 0
+    for i in range(k):
+        while (block := math.comb(n - x - 1, k - i - 1)) <= rank:
+            rank -= block
+            x += 1
+        combination.append(x)
+        x += 1
+    return combination
+
+
+def combination_blocks(
+    n: int, k: int, start: int, stop: int, block_size: int
+) -> Iterator[np.ndarray]:
+    """Combinations with lexicographic rank in [start, stop), as (block, k) arrays."""
+    combination = unrank_combination(start, n, k) if start < stop else []
+    remaining = stop - start
+    while remaining > 0:
+        size = min(block_size, remaining)
+        block = np.empty((size, k), dtype=np.int64)
+        for row in range(size):
+            block[row] = combination
+            i = k - 1
+            while i >= 0 and combination[i] == n - k + i:
+                i -= 1
+            if i < 0:
+                break
+            combination[i] += 1
+            for j in range(i + 1, k):
+                combination[j] = combination[j - 1] + 1
+        remaining -= size
+        yield block
+
+
+def rank_shards(start: int, stop: int, size: int) -> Iterator[tuple[int, int]]:
+    for shard_start in range(start, stop, size):
+        yield shard_start, min(shard_start + size, stop)
+
+
+def optimization_job_key(
+    model: NetworkModel, candidates: np.ndarray, p: int, mode: str
+) -> str:
+    """Identifies a run: same network content, candidates, p and mode."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model.fingerprint().encode())
+    digest.update(np.asarray(candidates, dtype=np.int64).tobytes())
+    digest.update(f"{p}:{mode}".encode())
+    return digest.hexdigest()
+
+
+def evaluate_rank_range(
+    cost: np.ndarray | SharedMatrix,
+    candidates: np.ndarray,
+    p: int,
+    start: int,
+    stop: int,
+    control: SearchControl | None = None,
+) -> tuple[float, tuple[int, ...] | None]:
+    """Cheapest p-combination of candidates whose lexicographic rank is in [start, stop)."""
+    cost = search_cost(cost, candidates)
+    best_cost = float("inf")
+    best = None
+    block_size = max(
+        EVALUATION_BLOCK_BYTES // (cost.nbytes // cost.shape[1] * p or 1), 1
+    )
+    for combos in combination_blocks(len(candidates), p, start, stop, block_size):
+        if control is not None and control.stopped():
+            break
+        totals = population_costs(cost, combos)
+        i = int(totals.argmin())
+        if totals[i] < best_cost:
+            best_cost = float(totals[i])
+            best = tuple(int(candidates[j]) for j in combos[i])
+            if control is not None:
+                control.report(best_cost, best)
+    return best_cost, best
+
+
+def branch_and_bound(
+    cost: np.ndarray,
+    p: int,
+    incumbent: float,
+    roots: Sequence[int] | None = None,
+    control: SearchControl | None = None,
+) -> tuple[float, list[int] | None]:
+    """Depth-first search over p-subsets, pruned by a suffix-min lower bound.
+
+    Sites are visited cheapest-first; a partial selection with sites up to x
+    chosen can at best give each demand min(its current best, the cheapest
+    site after x). ``roots`` limits the search to subtrees whose first site is
+    at those positions in that order, so callers can shard the tree.
+    """
+    m = cost.shape[1]
+    order = np.argsort(cost.sum(axis=0), kind="stable")
+    cost = cost[:, order]
+    suffix_min = np.full((len(cost), m + 1), np.inf)
+    suffix_min[:, :m] = np.minimum.accumulate(cost[:, ::-1], axis=1)[:, ::-1]
+    tolerance = (
+        IMPROVEMENT_TOLERANCE * max(abs(incumbent), 1)
+        if np.isfinite(incumbent)
+        else 0.0
+    )
+    best_cost = incumbent
+    best = None
+    stack = [
+        (cost[:, j], [j]) for j in reversed(roots if roots is not None else range(m))
+    ]
+    nodes = 0
+    while stack:
+        nodes += 1
+        if (
+            control is not None
+            and nodes % CANCEL_CHECK_INTERVAL == 0
+            and control.stopped()
+        ):
+            break
+        served, chosen = stack.pop()
+        start, stop = chosen[-1] + 1, m - (p - len(chosen)) + 1
+        if len(chosen) == p:
+            total = float(served.sum())
+            if total < best_cost - tolerance:
+                best_cost, best = total, chosen
+                if control is not None:
+                    control.report(best_cost, order[best])
+            continue
+        if start >= stop:
+            continue
+        with_next = np.minimum(served[:, None], cost[:, start:stop])
+        if len(chosen) + 1 == p:
+            totals = with_next.sum(axis=0)
+            j = int(totals.argmin())
+            if totals[j] < best_cost - tolerance:
+                best_cost, best = float(totals[j]), chosen + [start + j]
+                if control is not None:
+                    control.report(best_cost, order[best])
+            continue
+        bounds = np.minimum(with_next, suffix_min[:, start + 1 : stop + 1]).sum(axis=0)
+        for j in reversed(np.flatnonzero(bounds < best_cost - tolerance)):
+            stack.append((with_next[:, j], chosen + [start + int(j)]))
+    if best is None:
+        return best_cost, None
+    return best_cost, sorted(int(order[j]) for j in best)
+
+
+def solve_branch_and_bound(
+    cost: np.ndarray | SharedMatrix,
+    candidates: np.ndarray,
+    p: int,
+    incumbent: float,
+    roots: Sequence[int] | None = None,
+    control: SearchControl | None = None,
+) -> tuple[float, list[int] | None]:
+    cost = search_cost(cost, candidates)
+    if control is not None:
+        control = control.for_candidates(candidates)
+    total, selection = branch_and_bound(cost, p, incumbent, roots, control)
+    if selection is None:
+        return total, None
+    return total, [int(candidates[j]) for j in selection]
+
+
+def _crossover(
+    rng: np.random.Generator, a: np.ndarray, b: np.ndarray, m: int, mutate: bool
+) -> np.ndarray:
+    """Keep the sites both parents share, fill up from the rest of either parent."""
+    shared = np.intersect1d(a, b)
+    rest = np.setdiff1d(np.union1d(a, b), shared)
+    child = np.concatenate(
+        (shared, rng.choice(rest, len(a) - len(shared), replace=False))
+    )
+    if mutate and len(child) < m:
+        closed = np.setdiff1d(np.arange(m), child)
+        child[rng.integers(len(child))] = rng.choice(closed)
+    return np.sort(child)
+
+
+def genetic_search(
+    cost: np.ndarray,
+    p: int,
+    seed: int = 0,
+    fixed_costs: np.ndarray | None = None,
+    initial: Sequence[Sequence[int]] = (),
+    population_size: int = GA_POPULATION_SIZE,
+    generations: int = GA_GENERATIONS,
+    control: SearchControl | None = None,
+) -> tuple[float, list[int]]:
+    """(mu + lambda) genetic search over p-subsets of columns.
+
+    Each generation is scored with one population_costs call; the same seed
+    and inputs always give the same answer.
+    """
+    rng = np.random.default_rng(seed)
+    m = cost.shape[1]
+    population = np.array(
+        [np.sort(np.asarray(selection)) for selection in initial]
+        + [
+            np.sort(rng.choice(m, p, replace=False))
+            for _ in range(population_size - len(initial))
+        ],
+        dtype=np.int64,
+    )
+    scores = population_costs(cost, population, fixed_costs)
+    best_cost = float(scores.min())
+    stalled = 0
+    if control is not None:
+        control.report(best_cost, population[scores.argmin()])
+    for _ in range(generations):
+        if stalled >= GA_STALL_GENERATIONS or (
+            control is not None and control.stopped()
+        ):
+            break
+        contenders = rng.integers(len(population), size=(population_size, 2, 2))
+        parents = np.where(
+            scores[contenders[..., 0]] <= scores[contenders[..., 1]],
+            contenders[..., 0],
+            contenders[..., 1],
+        )
+        mutations = rng.random(population_size) < GA_MUTATION_RATE
+        children = np.array(
+            [
+                _crossover(rng, population[a], population[b], m, mutate)
+                for (a, b), mutate in zip(parents, mutations)
+            ]
+        )
+        merged, first = np.unique(
+            np.vstack((population, children)), axis=0, return_index=True
+        )
+        merged_scores = np.concatenate(
+            (scores, population_costs(cost, children, fixed_costs))
+        )[first]
+        keep = np.argsort(merged_scores, kind="stable")[:population_size]
+        population, scores = merged[keep], merged_scores[keep]
+        if scores[0] < best_cost - IMPROVEMENT_TOLERANCE * max(abs(best_cost), 1):
+            best_cost = float(scores[0])
+            stalled = 0
+            if control is not None:
+                control.report(best_cost, population[0])
+        else:
+            stalled += 1
+    best = int(scores.argmin())
+    return float(scores[best]), population[best].tolist()
+
+
+def solve_genetic(
+    cost: np.ndarray | SharedMatrix,
+    candidates: np.ndarray,
+    p: int,
+    seed: int = 0,
+    control: SearchControl | None = None,
+) -> tuple[float, list[int]]:
+    """Seeded with the greedy start so it never does worse than that.
+
+    The result depends only on cost, p and seed.
+    """
+    cost = search_cost(cost, candidates)
+    if control is not None:
+        control = control.for_candidates(candidates)
+    start = fit_selection(cost, (), p)
+    total, selection = genetic_search(
+        cost, p, seed=seed, initial=[start], control=control
+    )
+    return total, sorted(int(candidates[j]) for j in selection)
+
+
+class ParetoPoint(TypedDict):
+    num_dcs: int
+    service_penalty: float
+    total_cost: float
+    next_day_share: float
+    facilities: list[str]
+
+
+def pareto_point(
+    model: NetworkModel,
+    cost: np.ndarray | SharedMatrix,
+    candidates: np.ndarray,
+    k: int,
+    service_penalty: float,
+) -> ParetoPoint:
+    """Cost-minimal k added sites with a next-day penalty, reported without the penalty.
+
+    cost is the candidates' search matrix at that service_penalty.
+    """
+    _, facilities = solve_greedy_interchange(cost, candidates, k)
+    facilities = sorted((*model.fixed_open, *facilities))
+    selected = np.asarray(facilities)
+    miles = outbound_miles_matrix(model, selected)
+    unit_cost = inbound_legs(model).cost_per_unit[selected][None, :] + (
+        miles * model.mode_costs["Parcel"]
+    )
+    fast = miles <= SERVICE_LEVEL_MAX_MILES[0]
+    chosen = (unit_cost + service_penalty * ~fast).argmin(axis=1)
+    rows = np.arange(model.num_demands)
+    units = model.demand_units
+    return {
+        "num_dcs": len(facilities),
+        "service_penalty": service_penalty,
+        "total_cost": float(unit_cost[rows, chosen] @ units),
+        "next_day_share": float(fast[rows, chosen] @ units / (units.sum() or 1) * 100),
+        "facilities": [model.facility_names[j] for j in facilities],
+    }
+
+
+def pareto_frontier(points: Sequence[ParetoPoint]) -> list[ParetoPoint]:
+    """Per number of DCs, the points no other beats on both cost and next-day share.
+
+    Without fixed facility costs more DCs are always cheaper and faster, so the
+    trade-off is only meaningful at a given k.
+    """
+    frontier: list[ParetoPoint] = []
+    for point in sorted(
+        points,
+        key=lambda point: (
+            point["num_dcs"],
+            point["total_cost"],
+            -point["next_day_share"],
+        ),
+    ):
+        last = frontier[-1] if frontier else None
+        if (
+            last is None
+            or last["num_dcs"] != point["num_dcs"]
+            or point["next_day_share"] > last["next_day_share"]
+        ):
+            frontier.append(point)
+    return frontier
+
+
+class MilpSolution(NamedTuple):
+    total_cost: float
+    facilities: list[int]
+    optimality_gap: float | None
+    solve_seconds: float
+    status: str
+    message: str = ""
+
+
+def solve_milp(
+    cost: np.ndarray,
+    p: int | None,
+    fixed_costs: np.ndarray | None = None,
+    time_limit: float = MILP_TIME_LIMIT_SECONDS,
+) -> MilpSolution:
+    """p-median (p given) or uncapacitated facility location (fixed_costs) via HiGHS.
+
+    Each demand row only gets assignment variables for its m - p + 1 cheapest
+    sites: at least one of them is open in any p-site solution, so the
+    restriction never cuts off an optimum.
+    """
+    started = time.perf_counter()
+    n, m = cost.shape
+    width = m if p is None else min(m, m - p + 1)
+    if width < m:
+        columns = np.argpartition(cost, width - 1, axis=1)[:, :width]
+    else:
+        columns = np.broadcast_to(np.arange(m), (n, m))
+    rows = np.repeat(np.arange(n), width)
+    columns = columns.ravel()
+    num_x = len(columns)
+    x_ids = np.arange(num_x)
+    objective = np.concatenate(
+        (
+            np.zeros(m) if fixed_costs is None else np.asarray(fixed_costs, float),
+            cost[rows, columns],
+        )
+    )
+    assign = sparse.csr_array((np.ones(num_x), (rows, m + x_ids)), shape=(n, m + num_x))
+    link = sparse.csr_array(
+        (
+            np.concatenate((np.ones(num_x), -np.ones(num_x))),
+            (np.concatenate((x_ids, x_ids)), np.concatenate((m + x_ids, columns))),
+        ),
+        shape=(num_x, m + num_x),
+    )
+    constraints = [
+        LinearConstraint(assign, 1, 1),
+        LinearConstraint(link, -np.inf, 0),
+    ]
+    if p is not None:
+        constraints.append(
+            LinearConstraint(
+                sparse.csr_array(
+                    (np.ones(m), (np.zeros(m, dtype=np.int64), np.arange(m))),
+                    shape=(1, m + num_x),
+                ),
+                p,
+                p,
+            )
+        )
+    result = milp(
+        objective,
+        constraints=constraints,
+        integrality=np.concatenate((np.ones(m), np.zeros(num_x))),
+        bounds=Bounds(0, 1),
+        options={"time_limit": time_limit, "disp": False},
+    )
+    solve_seconds = time.perf_counter() - started
+    status = MILP_STATUSES.get(result.status, "error")
+    if result.x is None:
+        return MilpSolution(
+            float("inf"), [], None, solve_seconds, status, result.message
+        )
+    facilities = np.flatnonzero(result.x[:m] > 0.5).tolist()
+    total = selection_cost(cost, facilities)
+    if fixed_costs is not None:
+        total += float(np.asarray(fixed_costs)[facilities].sum())
+    return MilpSolution(
+        total,
+        facilities,
+        float(getattr(result, "mip_gap", 0.0) or 0.0),
+        solve_seconds,
+        status,
+        result.message,
+    )
+
+
+def solve_exact(
+    cost: np.ndarray | SharedMatrix,
+    candidates: np.ndarray,
+    p: int,
+    control: SearchControl | None = None,
+) -> MilpSolution:
+    """HiGHS gets whatever is left of the search's time budget, capped at the limit."""
+    time_limit = MILP_TIME_LIMIT_SECONDS
+    if control is not None and control.remaining() is not None:
+        time_limit = min(time_limit, control.remaining())
+    solution = solve_milp(search_cost(cost, candidates), p, time_limit=time_limit)
+    return solution._replace(
+        facilities=sorted(int(candidates[j]) for j in solution.facilities)
+    )
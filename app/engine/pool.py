@@ -0,0 +1,110 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import SyncManager
+from typing import Any, Callable, TypeVar
+
+SIMULATION_WORKERS = int(os.environ.get("SIMULATION_WORKERS", os.cpu_count() or 1))
+
+T = TypeVar("T")
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_manager: SyncManager | None = None
+
+
+def get_executor() -> ProcessPoolExecutor | None:
+    """Shared worker pool; None (the loop's thread pool) when SIMULATION_WORKERS=0."""
+    global _executor
+    if SIMULATION_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=SIMULATION_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _get_manager() -> SyncManager:
+    global _manager
+    with _executor_lock:
+        if _manager is None:
+            _manager = multiprocessing.get_context("spawn").Manager()
+        return _manager
+
+
+def new_shared_event() -> Any:
+    """An Event that pool workers can poll; a plain threading.Event without a pool."""
+    if get_executor() is None:
+        return threading.Event()
+    return _get_manager().Event()
+
+
+def new_shared_queue() -> Any:
+    """A Queue pool workers can put to; a plain queue.Queue without a pool."""
+    if get_executor() is None:
+        return queue.Queue()
+    return _get_manager().Queue()
+
+
+def reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_pool(fn: Callable[..., T], *args: Any) -> T:
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_executor(), fn, *args)
+    except BrokenProcessPool:
+        reset_executor()
+        raise
+
+
+def _send_result(connection: Any, fn: Callable[..., Any], args: tuple):
+    try:
+        connection.send((True, fn(*args)))
+    except BaseException as e:
+        connection.send((False, e))
+    finally:
+        connection.close()
+
+
+async def run_in_process(fn: Callable[..., T], *args: Any) -> T:
+    """fn(*args) in a process of its own, terminated if the caller is cancelled.
+
+    For work that cannot poll a stop flag (a HiGHS solve): cancelling the
+    awaiting task kills the process instead of leaving a pool worker busy.
+    Costs a process start per call; without a pool it runs in a thread.
+    """
+    loop = asyncio.get_running_loop()
+    if get_executor() is None:
+        return await loop.run_in_executor(None, fn, *args)
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_send_result, args=(sender, fn, args), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        ok, value = await loop.run_in_executor(None, receiver.recv)
+    except EOFError:
+        ok, value = False, None
+    finally:
+        if process.is_alive():
+            process.terminate()
+        await loop.run_in_executor(None, process.join)
+        receiver.close()
+    if ok:
+        return value
+    if value is None:
+        raise RuntimeError(f"Worker process exited with code {process.exitcode}.")
+    raise value
@@ -0,0 +1,174 @@
+from typing import Any, Mapping, Sequence
+
+TOP_25_US_PORTS = [
+    {
+        "name": "Port of Houston, TX",
+        "location": "Houston, TX",
+        "latitude": 29.7355,
+        "longitude": -95.269,
+    },
+    {
+        "name": "Port of South Louisiana, LA",
+        "location": "LaPlace, LA",
+        "latitude": 30.0666,
+        "longitude": -90.4801,
+    },
+    {
+        "name": "Port of Corpus Christi, TX",
+        "location": "Corpus Christi, TX",
+        "latitude": 27.8122,
+        "longitude": -97.3988,
+    },
+    {
+        "name": "Port of New York and New Jersey",
+        "location": "New York, NY",
+        "latitude": 40.684,
+        "longitude": -74.1502,
+    },
+    {
+        "name": "Port of Beaumont, TX",
+        "location": "Beaumont, TX",
+        "latitude": 30.0802,
+        "longitude": -94.0866,
+    },
+    {
+        "name": "Port of New Orleans, LA",
+        "location": "New Orleans, LA",
+        "latitude": 29.934,
+        "longitude": -90.059,
+    },
+    {
+        "name": "Port of Long Beach, CA",
+        "location": "Long Beach, CA",
+        "latitude": 33.7542,
+        "longitude": -118.2165,
+    },
+    {
+        "name": "Port of Virginia (Hampton Roads)",
+        "location": "Norfolk, VA",
+        "latitude": 36.8985,
+        "longitude": -76.3267,
+    },
+    {
+        "name": "Port of Los Angeles, CA",
+        "location": "Los Angeles, CA",
+        "latitude": 33.7361,
+        "longitude": -118.2639,
+    },
+    {
+        "name": "Port of Baton Rouge, LA",
+        "location": "Port Allen, LA",
+        "latitude": 30.4416,
+        "longitude": -91.2029,
+    },
+    {
+        "name": "Port of Mobile, AL",
+        "location": "Mobile, AL",
+        "latitude": 30.71,
+        "longitude": -88.042,
+    },
+    {
+        "name": "Port of Texas City, TX",
+        "location": "Texas City, TX",
+        "latitude": 29.3838,
+        "longitude": -94.9027,
+    },
+    {
+        "name": "Port of Savannah, GA",
+        "location": "Savannah, GA",
+        "latitude": 32.1277,
+        "longitude": -81.1424,
+    },
+    {
+        "name": "Port of Lake Charles, LA",
+        "location": "Lake Charles, LA",
+        "latitude": 30.2266,
+        "longitude": -93.2174,
+    },
+    {
+        "name": "Port of Plaquemines, LA",
+        "location": "Plaquemines Parish, LA",
+        "latitude": 29.584,
+        "longitude": -89.824,
+    },
+    {
+        "name": "Port of Baltimore, MD",
+        "location": "Baltimore, MD",
+        "latitude": 39.264,
+        "longitude": -76.579,
+    },
+    {
+        "name": "Port of Philadelphia, PA",
+        "location": "Philadelphia, PA",
+        "latitude": 39.92,
+        "longitude": -75.14,
+    },
+    {
+        "name": "Port of Freeport, TX",
+        "location": "Freeport, TX",
+        "latitude": 28.954,
+        "longitude": -95.3597,
+    },
+    {
+        "name": "Port of Charleston, SC",
+        "location": "Charleston, SC",
+        "latitude": 32.7835,
+        "longitude": -79.923,
+    },
+    {
+        "name": "Port of Seattle/Tacoma, WA (NWSA)",
+        "location": "Seattle/Tacoma, WA",
+        "latitude": 47.27,
+        "longitude": -122.413,
+    },
+    {
+        "name": "Port of Port Arthur, TX",
+        "location": "Port Arthur, TX",
+        "latitude": 29.87,
+        "longitude": -93.93,
+    },
+    {
+        "name": "Port of Oakland, CA",
+        "location": "Oakland, CA",
+        "latitude": 37.7955,
+        "longitude": -122.279,
+    },
+    {
+        "name": "Port of Jacksonville, FL",
+        "location": "Jacksonville, FL",
+        "latitude": 30.398,
+        "longitude": -81.57,
+    },
+    {
+        "name": "Port of Miami, FL",
+        "location": "Miami, FL",
+        "latitude": 25.778,
+        "longitude": -80.17,
+    },
+    {
+        "name": "Port of Greater Port Everglades, FL",
+        "location": "Fort Lauderdale, FL",
+        "latitude": 26.092,
+        "longitude": -80.12,
+    },
+]
+
+
+def with_port_coordinates(
+    inbound_sources: Sequence[Mapping[str, Any]],
+) -> list[dict[str, Any]]:
+    """Saved inbound sources, with coordinates filled in for known ports.
+
+    Sources saved before they carried coordinates get them from the port
+    list by location.
+    """
+    port_coordinates = {p["location"]: p for p in TOP_25_US_PORTS}
+    migrated_sources = []
+    for source in inbound_sources:
+        source = dict(source)
+        if "latitude" not in source and source["location"] in port_coordinates:
+            port = port_coordinates[source["location"]]
+            source["latitude"] = port["latitude"]
+            source["longitude"] = port["longitude"]
+        migrated_sources.append(source)
+    return migrated_sources
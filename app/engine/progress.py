@@ -0,0 +1,43 @@
+import math
+import os
+import time
+from typing import Callable
+
+PROGRESS_INTERVAL_SECONDS = float(os.environ.get("SIMULATION_PROGRESS_INTERVAL", 0.2))
+
+
+class ProgressPublisher:
+    """Coalesces progress updates so a background event only pushes useful frames.
+
+    Callers report every update they have; ``should_publish`` lets one through
+    at most once per interval, and only if the whole-number percentage or the
+    best cost changed since the last frame that went out.
+    """
+
+    def __init__(
+        self,
+        interval: float = PROGRESS_INTERVAL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval
+        self.clock = clock
+        self._published_at = -math.inf
+        self._published: tuple[int, float | None] | None = None
+
+    def should_publish(
+        self, percent: float, best_cost: float | None = None, force: bool = False
+    ) -> bool:
+        snapshot = (
+            round(percent),
+            round(best_cost, 2)
+            if best_cost is not None and math.isfinite(best_cost)
+            else None,
+        )
+        now = self.clock()
+        if not force and (
+            snapshot == self._published or now - self._published_at < self.interval
+        ):
+            return False
+        self._published = snapshot
+        self._published_at = now
+        return True
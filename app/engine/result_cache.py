@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from app.engine.model import NetworkModel
+from app.engine.simulation import SimulationTotals
+
+SIMULATION_CACHE_MAX_ENTRIES = int(os.environ.get("SIMULATION_CACHE_MAX_ENTRIES", 128))
+SIMULATION_CACHE_PERSIST = os.environ.get("SIMULATION_CACHE_PERSIST", "1") != "0"
+SIMULATION_CACHE_TTL_DAYS = float(os.environ.get("SIMULATION_CACHE_TTL_DAYS", 30))
+NON_SIMULATION_FIELDS = ("facility_lock", "service_penalty", "fixed_open")
+# Bump whenever the simulation math or SimulationTotals changes, so persisted
+# totals from an older engine are never served.
+SIMULATION_ENGINE_VERSION = 1
+TOTALS_SCHEMA = f"v{SIMULATION_ENGINE_VERSION}-" + hashlib.blake2b(
+    ",".join(SimulationTotals._fields).encode(), digest_size=4
+).hexdigest()
+
+
+def simulation_key(model: NetworkModel) -> str:
+    """Content hash of what a simulation reads; equal inputs share it across sessions."""
+    return f"{TOTALS_SCHEMA}:{model.fingerprint(exclude=NON_SIMULATION_FIELDS)}"
+
+
+def totals_to_json(totals: SimulationTotals) -> str:
+    return json.dumps(
+        {
+            name: value.tolist() if isinstance(value, np.ndarray) else value
+            for name, value in totals._asdict().items()
+        }
+    )
+
+
+def totals_from_json(text: str) -> SimulationTotals | None:
+    """Decoded totals, or None if the row does not match SimulationTotals."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or set(data) != set(SimulationTotals._fields):
+        return None
+    return SimulationTotals(
+        **{
+            name: np.array(value, dtype=np.float64)
+            if isinstance(value, list)
+            else value
+            for name, value in data.items()
+        }
+    )
+
+
+class SimulationCache:
+    """Most recently used simulation totals by simulation_key, in this process.
+
+    Totals rather than results are kept so a hit can also rebuild the cost
+    aggregates used for repricing.
+    """
+
+    def __init__(self, max_entries: int = SIMULATION_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, SimulationTotals] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> SimulationTotals | None:
+        with self._lock:
+            totals = self._entries.get(key)
+            if totals is not None:
+                self._entries.move_to_end(key)
+            return totals
+
+    def put(self, key: str, totals: SimulationTotals):
+        with self._lock:
+            self._entries[key] = totals
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+SIMULATION_CACHE = SimulationCache()
@@ -0,0 +1,408 @@
+"""One optimization run in any mode, shared by the app and the headless API.
+
+run_search builds the cost matrix, dispatches on the mode and decides the
+run's status. A SearchRunner decides where the work runs: the base runner
+does everything in this process, the app's fans shards out to the process
+pool, streams incumbents to the page and checkpoints brute force.
+"""
+
+import contextlib
+import functools
+import math
+import time
+from dataclasses import replace
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, NamedTuple
+import numpy as np
+from app.engine.jobs import SearchControl, SearchStopped
+from app.engine.model import NetworkModel
+from app.engine.optimization import (
+    BRANCH_AND_BOUND,
+    BRUTE_FORCE,
+    BRUTE_FORCE_MAX_COMBINATIONS,
+    CHECKPOINT_INTERVAL_SECONDS,
+    EXACT_MILP,
+    GENETIC,
+    OPTIMIZATION_BATCH_SIZE,
+    PARETO_FRONTIER,
+    IncumbentStream,
+    MilpSolution,
+    ParetoPoint,
+    baseline_cost,
+    cost_columns,
+    evaluate_rank_range,
+    optimization_candidates,
+    optimization_job_key,
+    pareto_frontier,
+    pareto_point,
+    problem_columns,
+    rank_shards,
+    solve_branch_and_bound,
+    solve_exact,
+    solve_genetic,
+    solve_greedy_interchange,
+    transport_cost,
+    with_fixed_open,
+)
+from app.engine.shared_matrix import SharedMatrix
+
+ShardTask = tuple[Callable[..., Any], tuple, float]
+
+
+class OptimizationProblem(NamedTuple):
+    model: NetworkModel
+    candidates: np.ndarray
+    p: int
+    facility_type: str
+    mode: str
+    pinned_only: bool = False
+
+
+class SearchOutcome(NamedTuple):
+    stream: IncumbentStream
+    status: str
+    optimality_gap: float | None
+    pareto_frontier: list[ParetoPoint]
+    error: str | None
+
+
+def optimization_problem(
+    model: NetworkModel, facility_type: str, num_dcs: int, mode: str
+) -> OptimizationProblem:
+    """The candidates and how many of them to open; ValueError says why not.
+
+    Asking for exactly the locked-open sites gives a problem whose candidates
+    are those sites, all of which must open, so it reports their cost.
+    """
+    model, candidates = optimization_candidates(model, facility_type)
+    num_fixed = len(model.fixed_open)
+    p = num_dcs - num_fixed
+    if num_fixed and p < 0:
+        raise ValueError(
+            f"{num_fixed} {'site is' if num_fixed == 1 else 'sites are'} "
+            f"locked open; select at least {num_fixed} DCs."
+        )
+    if num_fixed and p == 0:
+        # Exactly the pinned network: every mode picks all of its sites.
+        candidates = np.asarray(model.fixed_open, dtype=np.int64)
+        model = replace(model, fixed_open=())
+        return OptimizationProblem(
+            model, candidates, num_fixed, facility_type, mode, pinned_only=True
+        )
+    if p < 1 or len(candidates) < p:
+        raise ValueError("Not enough candidate facilities to run optimization.")
+    if mode == BRUTE_FORCE and (
+        math.comb(len(candidates), p) > BRUTE_FORCE_MAX_COMBINATIONS
+    ):
+        raise ValueError(
+            f"Brute force is limited to {BRUTE_FORCE_MAX_COMBINATIONS:,} "
+            "combinations; use a heuristic mode for this instance."
+        )
+    return OptimizationProblem(model, candidates, p, facility_type, mode)
+
+
+class SearchRunner:
+    """Runs a search's work in this process, one task after another."""
+
+    workers = 1
+
+    def __init__(self, time_budget: float = 0.0):
+        self.time_budget = time_budget
+
+    def start_control(self) -> SearchControl:
+        return SearchControl.local(self.time_budget)
+
+    @contextlib.asynccontextmanager
+    async def cost_matrices(
+        self,
+        models: list[NetworkModel],
+        candidates: np.ndarray,
+        facility_type: str,
+        control: SearchControl,
+    ) -> AsyncIterator[list[tuple[np.ndarray | SharedMatrix, float]]]:
+        """Search matrix and baseline cost per model, valid inside the block.
+
+        Raises SearchStopped if control stops the build.
+        """
+        matrices = []
+        for model in models:
+            columns = problem_columns(model, candidates, facility_type)
+            raw = cost_columns(model, columns, control)
+            search = with_fixed_open(raw, len(candidates), len(model.fixed_open))
+            matrices.append((search, baseline_cost(model, columns, raw)))
+        yield matrices
+
+    async def call(
+        self,
+        control: SearchControl,
+        stream: IncumbentStream,
+        fn: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        return fn(*args)
+
+    async def shards(
+        self,
+        control: SearchControl,
+        stream: IncumbentStream,
+        tasks: Iterable[ShardTask],
+        on_result: Callable[[int, Any], Awaitable[None]],
+        total_weight: float,
+        completed_weight: float = 0.0,
+    ):
+        for i, (fn, args, _) in enumerate(tasks):
+            if control.stopped():
+                break
+            await on_result(i, fn(*args))
+
+    def warm_start(self, model: NetworkModel, candidates: np.ndarray) -> list[int]:
+        return []
+
+    async def resume(self, job_key: str) -> tuple[int, float, list[int]]:
+        """Where brute force left off: next rank, best cost and facilities."""
+        return 0, math.inf, []
+
+    async def checkpoint(
+        self,
+        job_key: str,
+        next_rank: int,
+        total: int,
+        best_cost: float,
+        best_facilities: list[int],
+    ):
+        pass
+
+    async def clear_checkpoint(self, job_key: str):
+        pass
+
+
+async def _greedy_interchange(
+    problem: OptimizationProblem,
+    runner: SearchRunner,
+    control: SearchControl,
+    stream: IncumbentStream,
+    cost: np.ndarray | SharedMatrix,
+):
+    stream.offer(
+        *await runner.call(
+            control,
+            stream,
+            solve_greedy_interchange,
+            cost,
+            problem.candidates,
+            problem.p,
+            control,
+            runner.warm_start(problem.model, problem.candidates),
+        )
+    )
+
+
+async def _branch_and_bound(
+    problem: OptimizationProblem,
+    runner: SearchRunner,
+    control: SearchControl,
+    stream: IncumbentStream,
+    cost: np.ndarray | SharedMatrix,
+):
+    await _greedy_interchange(problem, runner, control, stream, cost)
+    candidates, p = problem.candidates, problem.p
+    roots = np.arange(len(candidates) - p + 1)
+    shards = np.array_split(roots, min(len(roots), runner.workers * 4))
+    subtree_sizes = [
+        sum(math.comb(len(candidates) - j - 1, p - 1) for j in shard)
+        for shard in shards
+    ]
+
+    async def on_result(i: int, result: tuple[float, list[int] | None]):
+        stream.offer(*result)
+
+    await runner.shards(
+        control,
+        stream,
+        (
+            (
+                solve_branch_and_bound,
+                (cost, candidates, p, stream.best_cost, shard.tolist(), control),
+                size,
+            )
+            for shard, size in zip(shards, subtree_sizes)
+        ),
+        on_result,
+        total_weight=sum(subtree_sizes),
+    )
+
+
+async def _brute_force(
+    problem: OptimizationProblem,
+    runner: SearchRunner,
+    control: SearchControl,
+    stream: IncumbentStream,
+    cost: np.ndarray | SharedMatrix,
+):
+    model, candidates, p = problem.model, problem.candidates, problem.p
+    total = math.comb(len(candidates), p)
+    job_key = optimization_job_key(model, candidates, p, BRUTE_FORCE)
+    next_rank, best_cost, best_facilities = await runner.resume(job_key)
+    stream.offer(best_cost, best_facilities)
+    shards_per_worker = math.ceil(total / runner.workers / 4)
+    shard_size = max(min(OPTIMIZATION_BATCH_SIZE, shards_per_worker), 1)
+    first_rank = next_rank
+    next_shard = 0
+    finished: set[int] = set()
+    last_checkpoint = time.monotonic()
+
+    async def on_result(i: int, result: tuple[float, tuple[int, ...] | None]):
+        nonlocal next_rank, next_shard, last_checkpoint
+        stream.offer(*result)
+        if control.stopped():
+            return
+        finished.add(i)
+        while next_shard in finished:
+            finished.remove(next_shard)
+            next_shard += 1
+        next_rank = min(first_rank + next_shard * shard_size, total)
+        if time.monotonic() - last_checkpoint >= CHECKPOINT_INTERVAL_SECONDS:
+            await runner.checkpoint(
+                job_key, next_rank, total, stream.best_cost, stream.facilities
+            )
+            last_checkpoint = time.monotonic()
+
+    await runner.shards(
+        control,
+        stream,
+        (
+            (
+                evaluate_rank_range,
+                (cost, candidates, p, start, stop, control),
+                stop - start,
+            )
+            for start, stop in rank_shards(next_rank, total, shard_size)
+        ),
+        on_result,
+        total_weight=total,
+        completed_weight=next_rank,
+    )
+    if next_rank >= total:
+        await runner.clear_checkpoint(job_key)
+    else:
+        await runner.checkpoint(
+            job_key, next_rank, total, stream.best_cost, stream.facilities
+        )
+
+
+async def _pareto(
+    problem: OptimizationProblem,
+    runner: SearchRunner,
+    control: SearchControl,
+    stream: IncumbentStream,
+    penalties: list[float],
+    costs: list[np.ndarray | SharedMatrix],
+) -> list[ParetoPoint]:
+    first_k = problem.p if problem.pinned_only else 1
+    tasks = [
+        (k, w, cost)
+        for k in range(first_k, problem.p + 1)
+        for w, cost in zip(penalties, costs)
+    ]
+    points: list[ParetoPoint] = []
+
+    async def on_result(i: int, point: ParetoPoint):
+        points.append(point)
+
+    await runner.shards(
+        control,
+        stream,
+        (
+            (pareto_point, (problem.model, cost, problem.candidates, k, w), 1)
+            for k, w, cost in tasks
+        ),
+        on_result,
+        total_weight=len(tasks),
+    )
+    return pareto_frontier(points)
+
+
+async def run_search(
+    problem: OptimizationProblem,
+    runner: SearchRunner,
+    seed: int = 0,
+    pareto_penalties: Iterable[float] = (),
+) -> SearchOutcome:
+    """Solve the problem in its mode; error explains a run that found nothing."""
+    model, candidates, p = problem.model, problem.candidates, problem.p
+    penalties = list(pareto_penalties) or [0.0]
+    models = [model]
+    if problem.mode == PARETO_FRONTIER:
+        models = [replace(model, service_penalty=w) for w in penalties]
+    milp_solution: MilpSolution | None = None
+    frontier: list[ParetoPoint] = []
+    control = runner.start_control()
+    stream = IncumbentStream(
+        model.facility_names,
+        math.nan,
+        fixed_open=model.fixed_open,
+        price=(
+            functools.partial(transport_cost, model) if model.service_penalty else None
+        ),
+    )
+    try:
+        async with runner.cost_matrices(
+            models, candidates, problem.facility_type, control
+        ) as matrices:
+            cost, stream.baseline_cost = matrices[0]
+            if problem.mode == PARETO_FRONTIER:
+                frontier = await _pareto(
+                    problem,
+                    runner,
+                    control,
+                    stream,
+                    penalties,
+                    [search for search, _ in matrices],
+                )
+            elif problem.mode == EXACT_MILP:
+                milp_solution = await runner.call(
+                    control, stream, solve_exact, cost, candidates, p, control
+                )
+                stream.offer(milp_solution.total_cost, milp_solution.facilities)
+            elif problem.mode == BRANCH_AND_BOUND:
+                await _branch_and_bound(problem, runner, control, stream, cost)
+            elif problem.mode == GENETIC:
+                stream.offer(
+                    *await runner.call(
+                        control,
+                        stream,
+                        solve_genetic,
+                        cost,
+                        candidates,
+                        p,
+                        seed,
+                        control,
+                    )
+                )
+            elif problem.mode == BRUTE_FORCE:
+                await _brute_force(problem, runner, control, stream, cost)
+            else:
+                await _greedy_interchange(problem, runner, control, stream, cost)
+    except SearchStopped:
+        pass
+    for total, facilities in control.drain():
+        stream.offer(total, facilities)
+    optimality_gap = None
+    if milp_solution is not None and milp_solution.optimality_gap is not None:
+        optimality_gap = milp_solution.optimality_gap * 100
+    if control.cancel_event.is_set():
+        status = "cancelled"
+    elif control.expired or (
+        milp_solution is not None and milp_solution.status == "time_limit"
+    ):
+        status = "time_limit"
+    else:
+        status = "completed"
+    error = None
+    if status == "cancelled" and not stream.facilities:
+        error = "Optimization cancelled."
+    elif not stream.facilities and problem.mode != PARETO_FRONTIER:
+        if status == "time_limit":
+            error = "The time budget ran out before a solution was found."
+        elif milp_solution is not None:
+            error = f"The MILP solver found no solution: {milp_solution.message}"
+    return SearchOutcome(stream, status, optimality_gap, frontier, error)
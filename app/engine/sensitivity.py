@@ -0,0 +1,96 @@
+import itertools
+import numpy as np
+from typing import Mapping, NamedTuple, Sequence, TypedDict
+from app.engine.model import NetworkModel
+from app.engine.simulation import (
+    FALLBACK_SOURCE_NAME,
+    SimulationResult,
+    SimulationTotals,
+    inbound_lanes,
+    price_inbound_lanes,
+)
+
+
+class CostAggregates(NamedTuple):
+    """Rate-independent sums of a simulation run, per facility and inbound lane.
+
+    Outbound cost is the Parcel rate times the unit-miles, inbound cost each
+    facility's units times its cheapest lane, so a rate change reprices in
+    O(facilities x sources) without touching the demand.
+    """
+
+    facility_units: np.ndarray
+    facility_unit_miles: np.ndarray
+    lane_miles: np.ndarray
+    lane_overrides: np.ndarray
+    source_names: tuple[str, ...]
+
+
+class RateScenario(TypedDict):
+    mode_costs: dict[str, float]
+    total_cost: float
+    inbound_cost: float
+    outbound_cost: float
+
+
+def cost_aggregates(model: NetworkModel, totals: SimulationTotals) -> CostAggregates:
+    lane_miles, lane_overrides = inbound_lanes(model)
+    return CostAggregates(
+        facility_units=totals.facility_units,
+        facility_unit_miles=totals.facility_unit_miles,
+        lane_miles=lane_miles,
+        lane_overrides=lane_overrides,
+        source_names=model.source_names or (FALLBACK_SOURCE_NAME,),
+    )
+
+
+def reprice(
+    aggregates: CostAggregates,
+    result: SimulationResult,
+    mode_costs: Mapping[str, float],
+) -> SimulationResult:
+    """The result at other per-mile rates; service levels and volumes are unchanged."""
+    legs = price_inbound_lanes(
+        aggregates.lane_miles, aggregates.lane_overrides, mode_costs["TL"]
+    )
+    inbound_cost = float(legs.cost_per_unit @ aggregates.facility_units)
+    outbound_cost = float(aggregates.facility_unit_miles.sum() * mode_costs["Parcel"])
+    inbound_volume: dict[str, int] = {}
+    source_units = np.bincount(
+        legs.source,
+        weights=aggregates.facility_units,
+        minlength=len(aggregates.source_names),
+    )
+    for name, units_in in zip(aggregates.source_names, source_units):
+        if units_in > 0:
+            inbound_volume[name] = inbound_volume.get(name, 0) + int(round(units_in))
+    return {
+        **result,
+        "total_cost": inbound_cost + outbound_cost,
+        "cost_breakdown": {"inbound": inbound_cost, "outbound": outbound_cost},
+        "avg_inbound_dist": float(legs.miles @ aggregates.facility_units)
+        / result["total_demand_units"],
+        "inbound_volume": inbound_volume,
+    }
+
+
+def rate_sweep(
+    aggregates: CostAggregates,
+    result: SimulationResult,
+    mode_costs: Mapping[str, float],
+    grid: Mapping[str, Sequence[float]],
+) -> list[RateScenario]:
+    """Reprice every combination of the rates in grid; other modes keep mode_costs."""
+    scenarios: list[RateScenario] = []
+    for rates in itertools.product(*grid.values()):
+        costs = {**mode_costs, **dict(zip(grid, map(float, rates)))}
+        priced = reprice(aggregates, result, costs)
+        scenarios.append(
+            {
+                "mode_costs": costs,
+                "total_cost": priced["total_cost"],
+                "inbound_cost": priced["cost_breakdown"]["inbound"],
+                "outbound_cost": priced["cost_breakdown"]["outbound"],
+            }
+        )
+    return scenarios
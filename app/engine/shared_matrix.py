@@ -0,0 +1,74 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, NamedTuple
+
+MAX_ATTACHED = 4
+
+
+class SharedMatrix(NamedTuple):
+    """Picklable handle to a float64 matrix in shared memory.
+
+    Pool workers attach to the block by name instead of receiving a copy.
+    The process that keeps track of a block (the main process) unlinks it.
+    """
+
+    name: str
+    shape: tuple[int, int]
+
+
+_attached: OrderedDict[str, SharedMemory] = OrderedDict()
+_attached_lock = threading.Lock()
+
+
+def share_matrix(
+    shape: tuple[int, int], fill: Callable[[np.ndarray], None]
+) -> SharedMatrix:
+    """A new block of the shape, written by fill; this process does not keep it mapped."""
+    shape = (int(shape[0]), int(shape[1]))
+    block = SharedMemory(create=True, size=max(shape[0] * shape[1] * 8, 1))
+    try:
+        fill(np.ndarray(shape, dtype=np.float64, buffer=block.buf))
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+    return SharedMatrix(block.name, shape)
+
+
+def as_array(matrix: np.ndarray | SharedMatrix) -> np.ndarray:
+    """The matrix itself, or a read-only view of the shared block.
+
+    The last MAX_ATTACHED blocks stay mapped, so the shards of one run
+    attach once per worker.
+    """
+    if isinstance(matrix, np.ndarray):
+        return matrix
+    with _attached_lock:
+        block = _attached.get(matrix.name)
+        if block is None:
+            block = _attached[matrix.name] = SharedMemory(name=matrix.name)
+        _attached.move_to_end(matrix.name)
+        for name in list(_attached)[:-MAX_ATTACHED]:
+            try:
+                _attached[name].close()
+            except BufferError:
+                continue
+            del _attached[name]
+    array = np.ndarray(matrix.shape, dtype=np.float64, buffer=block.buf)
+    array.setflags(write=False)
+    return array
+
+
+def unlink(matrix: SharedMatrix):
+    with _attached_lock:
+        block = _attached.pop(matrix.name, None)
+    try:
+        if block is None:
+            block = SharedMemory(name=matrix.name)
+        block.unlink()
+        block.close()
+    except (FileNotFoundError, BufferError):
+        pass
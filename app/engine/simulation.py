@@ -0,0 +1,181 @@
+import os
+import numpy as np
+from typing import NamedTuple, TypedDict
+from app.engine.geo import haversine_matrix, haversine_pairs
+from app.engine.model import NetworkModel
+
+FALLBACK_SOURCE_NAME = "Port of Los Angeles, CA"
+FALLBACK_SOURCE_LAT, FALLBACK_SOURCE_LON = (33.7292, -118.262)
+DEFAULT_OUTBOUND_MILES = 50.0
+SIMULATION_CHUNK_SIZE = int(os.environ.get("SIMULATION_CHUNK_SIZE", 10_000))
+SERVICE_LEVEL_LABELS = ("<24h", "<48h", ">=48h")
+SERVICE_LEVEL_MAX_MILES = np.array([500.0, 1000.0])
+
+
+class SimulationResult(TypedDict):
+    total_cost: float
+    cost_breakdown: dict[str, float]
+    service_levels: dict[str, float]
+    facility_utilization: dict[str, int]
+    avg_inbound_dist: float
+    avg_outbound_dist: float
+    total_demand_units: int
+    inbound_volume: dict[str, int]
+
+
+class InboundLegs(NamedTuple):
+    cost_per_unit: np.ndarray
+    miles: np.ndarray
+    source: np.ndarray
+
+
+def inbound_lanes(model: NetworkModel) -> tuple[np.ndarray, np.ndarray]:
+    """Miles and edge-override rates (NaN = TL) of every facility <- source lane.
+
+    Without inbound sources the only lane is from the fallback port.
+    """
+    if not model.num_sources:
+        miles = haversine_matrix(
+            model.facility_lat,
+            model.facility_lon,
+            np.array([FALLBACK_SOURCE_LAT]),
+            np.array([FALLBACK_SOURCE_LON]),
+        )
+        return miles, np.full(miles.shape, np.nan)
+    miles = haversine_matrix(
+        model.facility_lat, model.facility_lon, model.source_lat, model.source_lon
+    )
+    return miles, model.inbound_rate_overrides()
+
+
+def price_inbound_lanes(
+    miles: np.ndarray, overrides: np.ndarray, tl_cost_per_mile: float
+) -> InboundLegs:
+    lane_cost = miles * np.where(np.isnan(overrides), tl_cost_per_mile, overrides)
+    source = lane_cost.argmin(axis=1)
+    rows = np.arange(len(miles))
+    return InboundLegs(lane_cost[rows, source], miles[rows, source], source)
+
+
+def inbound_legs(model: NetworkModel) -> InboundLegs:
+    """Cheapest source lane into every facility; source -1 is the fallback port."""
+    legs = price_inbound_lanes(*inbound_lanes(model), model.mode_costs["TL"])
+    if not model.num_sources:
+        return legs._replace(source=np.full(model.num_facilities, -1, dtype=np.int64))
+    return legs
+
+
+class SimulationTotals(NamedTuple):
+    demand_units: float
+    inbound_cost: float
+    outbound_cost: float
+    inbound_unit_miles: float
+    outbound_unit_miles: float
+    service_units: np.ndarray
+    facility_units: np.ndarray
+    facility_unit_miles: np.ndarray
+    source_units: np.ndarray
+
+
+def chunk_ranges(num_demands: int, chunk_size: int) -> list[tuple[int, int]]:
+    chunk_size = max(int(chunk_size), 1)
+    return [
+        (start, min(start + chunk_size, num_demands))
+        for start in range(0, num_demands, chunk_size)
+    ]
+
+
+def simulate_chunk(
+    model: NetworkModel, open_facilities: np.ndarray | None = None
+) -> SimulationTotals:
+    """Partial sums over the model's demand; pass a demand_slice to chunk a run."""
+    units = model.demand_units
+    assigned = model.demand_facility
+    served = assigned >= 0
+    if open_facilities is not None:
+        served &= open_facilities[np.maximum(assigned, 0)]
+    served_units = units[served]
+    served_facility = assigned[served]
+    inbound = inbound_legs(model)
+    outbound_dist = haversine_pairs(
+        model.demand_lat[served],
+        model.demand_lon[served],
+        model.facility_lat[served_facility],
+        model.facility_lon[served_facility],
+    )
+    outbound_dist[np.isnan(outbound_dist)] = DEFAULT_OUTBOUND_MILES
+    outbound_unit_miles = float(outbound_dist @ served_units)
+    return SimulationTotals(
+        demand_units=float(units.sum()),
+        inbound_cost=float(inbound.cost_per_unit[served_facility] @ served_units),
+        outbound_cost=outbound_unit_miles * model.mode_costs["Parcel"],
+        inbound_unit_miles=float(inbound.miles[served_facility] @ served_units),
+        outbound_unit_miles=outbound_unit_miles,
+        service_units=np.bincount(
+            np.searchsorted(SERVICE_LEVEL_MAX_MILES, outbound_dist),
+            weights=served_units,
+            minlength=len(SERVICE_LEVEL_LABELS),
+        ),
+        facility_units=np.bincount(
+            served_facility, weights=served_units, minlength=model.num_facilities
+        ),
+        facility_unit_miles=np.bincount(
+            served_facility,
+            weights=outbound_dist * served_units,
+            minlength=model.num_facilities,
+        ),
+        source_units=np.bincount(
+            inbound.source[served_facility] + 1,
+            weights=served_units,
+            minlength=model.num_sources + 1,
+        ),
+    )
+
+
+def merge_totals(a: SimulationTotals, b: SimulationTotals) -> SimulationTotals:
+    return SimulationTotals(*(x + y for x, y in zip(a, b)))
+
+
+def finalize_result(
+    model: NetworkModel,
+    totals: SimulationTotals,
+    open_facilities: np.ndarray | None = None,
+) -> SimulationResult:
+    total_demand_units = int(round(totals.demand_units)) or 1
+    inbound_volume: dict[str, int] = {}
+    for s, units_in in enumerate(totals.source_units):
+        if units_in > 0:
+            name = model.source_names[s - 1] if s else FALLBACK_SOURCE_NAME
+            inbound_volume[name] = inbound_volume.get(name, 0) + int(round(units_in))
+    open_indices = (
+        range(model.num_facilities)
+        if open_facilities is None
+        else np.flatnonzero(open_facilities)
+    )
+    return {
+        "total_cost": totals.inbound_cost + totals.outbound_cost,
+        "cost_breakdown": {
+            "inbound": totals.inbound_cost,
+            "outbound": totals.outbound_cost,
+        },
+        "service_levels": {
+            label: float(v) / total_demand_units * 100
+            for label, v in zip(SERVICE_LEVEL_LABELS, totals.service_units)
+        },
+        "facility_utilization": {
+            model.facility_ids[i]: int(round(totals.facility_units[i]))
+            for i in open_indices
+        },
+        "avg_inbound_dist": totals.inbound_unit_miles / total_demand_units,
+        "avg_outbound_dist": totals.outbound_unit_miles / total_demand_units,
+        "total_demand_units": total_demand_units,
+        "inbound_volume": inbound_volume,
+    }
+
+
+def simulate(
+    model: NetworkModel, open_facilities: np.ndarray | None = None
+) -> SimulationResult:
+    return finalize_result(
+        model, simulate_chunk(model, open_facilities), open_facilities
+    )
@@ -0,0 +1,217 @@
+import atexit
+import os
+import threading
+import numpy as np
+from collections import Counter, OrderedDict
+from typing import Hashable, NamedTuple, Sequence
+from app.engine.jobs import SearchControl
+from app.engine.model import NetworkModel
+from app.engine.optimization import (
+    baseline_cost,
+    cost_columns,
+    cost_matrix_keys,
+    with_fixed_open,
+)
+from app.engine.shared_matrix import SharedMatrix, as_array, share_matrix, unlink
+
+COST_MATRIX_CACHE_MAX_BYTES = int(
+    os.environ.get("COST_MATRIX_CACHE_MAX_BYTES", 256 * 1024**2)
+)
+MAX_REMEMBERED_SOLUTIONS = 256
+
+
+class CachedMatrix(NamedTuple):
+    """A cost_columns matrix in shared memory and the keys it was built for."""
+
+    matrix: SharedMatrix
+    demand_key: Hashable
+    column_keys: tuple[Hashable, ...]
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.shape[0] * self.matrix.shape[1] * 8
+
+
+class CostMatrixCache:
+    """Last cost matrix built per network and service penalty, in shared memory.
+
+    Lives in the main process, so a re-solve reuses the matrix whichever pool
+    worker runs it and every worker reads the same block. Runs check an entry
+    out while a worker builds from it; a replaced or evicted block is unlinked
+    once the last run holding it checks it back in. Bounded by total bytes.
+    """
+
+    def __init__(self, max_bytes: int = COST_MATRIX_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[Hashable, CachedMatrix] = OrderedDict()
+        self._leases: Counter[str] = Counter()
+        self._retired: dict[str, SharedMatrix] = {}
+        self._lock = threading.Lock()
+
+    def checkout(self, key: Hashable) -> CachedMatrix | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._leases[entry.matrix.name] += 1
+            return entry
+
+    def store(self, key: Hashable, entry: CachedMatrix):
+        """Cache entry, checked out to the caller."""
+        with self._lock:
+            self._leases[entry.matrix.name] += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.nbytes -= previous.nbytes
+                if previous.matrix.name != entry.matrix.name:
+                    self._retire(previous)
+            if entry.nbytes > self.max_bytes:
+                self._retired[entry.matrix.name] = entry.matrix
+                return
+            self._retired.pop(entry.matrix.name, None)
+            self._entries[key] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+                self._retire(evicted)
+
+    def checkin(self, entry: CachedMatrix | None, search: SharedMatrix | None = None):
+        """Release entry, and unlink the run's own search matrix if it has one."""
+        if search is not None and (entry is None or search != entry.matrix):
+            unlink(search)
+        if entry is None:
+            return
+        name = entry.matrix.name
+        with self._lock:
+            self._leases[name] -= 1
+            if self._leases[name] > 0:
+                return
+            del self._leases[name]
+            if self._retired.pop(name, None) is None:
+                return
+        unlink(entry.matrix)
+
+    def forget(self, network_key: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == network_key]:
+                evicted = self._entries.pop(key)
+                self.nbytes -= evicted.nbytes
+                self._retire(evicted)
+
+    def clear(self):
+        """Unlink every block, checked out or not."""
+        with self._lock:
+            matrices = [entry.matrix for entry in self._entries.values()]
+            matrices += self._retired.values()
+            self._entries.clear()
+            self._retired.clear()
+            self._leases.clear()
+            self.nbytes = 0
+        for matrix in matrices:
+            unlink(matrix)
+
+    def _retire(self, entry: CachedMatrix):
+        if self._leases[entry.matrix.name] > 0:
+            self._retired[entry.matrix.name] = entry.matrix
+        else:
+            self._leases.pop(entry.matrix.name, None)
+            unlink(entry.matrix)
+
+
+COST_MATRIX_CACHE = CostMatrixCache()
+atexit.register(COST_MATRIX_CACHE.clear)
+
+
+def build_cost_matrix(
+    model: NetworkModel,
+    columns: np.ndarray,
+    num_candidates: int,
+    previous: CachedMatrix | None = None,
+    control: SearchControl | None = None,
+) -> tuple[CachedMatrix, SharedMatrix, float]:
+    """Cost columns for problem_columns in shared memory, the search matrix and baseline.
+
+    Runs in a pool worker. Columns whose keys match previous are copied from
+    its block and only the rest are computed; previous itself comes back if
+    nothing changed. The search matrix is the raw block unless sites are
+    pinned open, when it is a new block the caller unlinks after the run.
+    Raises SearchStopped if control stops the build.
+    """
+    columns = np.asarray(columns, dtype=np.int64)
+    demand_key, column_keys = cost_matrix_keys(model, columns)
+    column_keys = tuple(column_keys)
+    cached_columns: dict[Hashable, int] = {}
+    if previous is not None and previous.demand_key == demand_key:
+        cached_columns = {key: j for j, key in enumerate(previous.column_keys)}
+    if cached_columns and previous.column_keys == column_keys:
+        entry = previous
+    else:
+        reused = [
+            (i, cached_columns[key])
+            for i, key in enumerate(column_keys)
+            if key in cached_columns
+        ]
+        missing = [i for i, key in enumerate(column_keys) if key not in cached_columns]
+        computed = None
+        if missing:
+            computed = cost_columns(model, columns[missing], control)
+        rows = len(computed) if computed is not None else previous.matrix.shape[0]
+
+        def fill(matrix: np.ndarray):
+            if missing:
+                matrix[:, missing] = computed
+            if reused:
+                cached = as_array(previous.matrix)
+                matrix[:, [i for i, _ in reused]] = cached[:, [j for _, j in reused]]
+
+        entry = CachedMatrix(
+            share_matrix((rows, len(column_keys)), fill), demand_key, column_keys
+        )
+    raw = as_array(entry.matrix)
+    baseline = baseline_cost(model, columns, raw)
+    num_fixed = len(model.fixed_open)
+    if not num_fixed:
+        return entry, entry.matrix, baseline
+    search = share_matrix(
+        (raw.shape[0], num_candidates),
+        lambda matrix: with_fixed_open(raw, num_candidates, num_fixed, out=matrix),
+    )
+    return entry, search, baseline
+
+
+_solutions: OrderedDict[tuple[str, str], list[str]] = OrderedDict()
+_solutions_lock = threading.Lock()
+
+
+def remember_solution(network_key: str, facility_type: str, facility_ids: list[str]):
+    """Keep a run's incumbent (by facility id) to warm-start the next run."""
+    with _solutions_lock:
+        _solutions[(network_key, facility_type)] = list(facility_ids)
+        _solutions.move_to_end((network_key, facility_type))
+        while len(_solutions) > MAX_REMEMBERED_SOLUTIONS:
+            _solutions.popitem(last=False)
+
+
+def recall_solution(
+    network_key: str,
+    facility_type: str,
+    facility_ids: Sequence[str],
+    candidates: np.ndarray,
+) -> list[int]:
+    """Positions in candidates of the remembered sites that are still candidates."""
+    with _solutions_lock:
+        remembered = set(_solutions.get((network_key, facility_type), ()))
+    return [
+        position
+        for position, j in enumerate(candidates)
+        if facility_ids[j] in remembered
+    ]
+
+
+def forget_network(network_key: str):
+    COST_MATRIX_CACHE.forget(network_key)
+    with _solutions_lock:
+        for key in [key for key in _solutions if key[0] == network_key]:
+            del _solutions[key]
@@ -0,0 +1,141 @@
+import argparse
+import csv
+import functools
+import numpy as np
+from pathlib import Path
+from typing import Iterable, Sequence
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+ZIP_INDEX_PATH = DATA_DIR / "zip_centroids.npy"
+ZIP5_SOURCE_PATH = DATA_DIR / "zip5_centroids.csv"
+ZIP3_SOURCE_PATH = DATA_DIR / "zip3_centroids.csv"
+ZIP3_KEY_OFFSET = 100_000
+CENTROID_DTYPE = np.dtype([("key", "<u4"), ("lat", "<f4"), ("lon", "<f4")])
+DELIMITER_ALIASES = {"TAB": "\t", "\\t": "\t"}
+
+
+def zip_key(zip_code: str) -> int:
+    digits = "".join(ch for ch in str(zip_code).split("-")[0] if ch.isdigit())
+    if len(digits) == 3:
+        return ZIP3_KEY_OFFSET + int(digits)
+    if len(digits) in (4, 5):
+        return int(digits)
+    if len(digits) == 9:
+        return int(digits[:5])
+    return -1
+
+
+@functools.lru_cache(maxsize=None)
+def load_zip_index(path: Path = ZIP_INDEX_PATH) -> np.ndarray:
+    return np.load(path, mmap_mode="r")
+
+
+def resolve_zip_codes(
+    zip_codes: Sequence[str], index: np.ndarray | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Centroid lat/lon per ZIP5 or ZIP3 code, NaN where the code is unknown.
+
+    ZIP5 codes missing from the table fall back to their ZIP3 prefix.
+    """
+    if index is None:
+        index = load_zip_index()
+    keys = np.array([zip_key(z) for z in zip_codes], dtype=np.int64)
+    lat = np.full(len(keys), np.nan)
+    lon = np.full(len(keys), np.nan)
+    table_keys = index["key"]
+    for lookup in (
+        keys,
+        np.where(keys < ZIP3_KEY_OFFSET, ZIP3_KEY_OFFSET + keys // 100, -1),
+    ):
+        pending = np.isnan(lat) & (lookup >= 0)
+        if not pending.any() or not len(table_keys):
+            break
+        pos = np.minimum(
+            np.searchsorted(table_keys, lookup[pending]), len(table_keys) - 1
+        )
+        found = table_keys[pos] == lookup[pending]
+        rows = np.flatnonzero(pending)[found]
+        lat[rows] = index["lat"][pos[found]]
+        lon[rows] = index["lon"][pos[found]]
+    return lat, lon
+
+
+def build_zip_index(rows: Iterable[tuple[str, float, float]]) -> np.ndarray:
+    """Sorted centroid table from (zip, lat, lon) rows.
+
+    ZIP3 prefixes without an explicit row get the mean of their ZIP5 centroids.
+    """
+    centroids: dict[int, tuple[float, float]] = {}
+    prefix_points: dict[int, list[tuple[float, float]]] = {}
+    for zip_code, lat, lon in rows:
+        key = zip_key(zip_code)
+        if key < 0:
+            continue
+        centroids[key] = (lat, lon)
+        if key < ZIP3_KEY_OFFSET:
+            prefix_points.setdefault(ZIP3_KEY_OFFSET + key // 100, []).append(
+                (lat, lon)
+            )
+    for key, points in prefix_points.items():
+        if key not in centroids:
+            centroids[key] = tuple(np.mean(points, axis=0))
+    table = np.array(
+        [(key, lat, lon) for key, (lat, lon) in centroids.items()], dtype=CENTROID_DTYPE
+    )
+    table.sort(order="key")
+    return table
+
+
+def read_centroid_rows(
+    path: Path,
+    zip_column: str = "zip",
+    lat_column: str = "latitude",
+    lon_column: str = "longitude",
+    delimiter: str = ",",
+) -> list[tuple[str, float, float]]:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(
+            f, delimiter=DELIMITER_ALIASES.get(delimiter, delimiter)
+        )
+        reader.fieldnames = [name.strip() for name in reader.fieldnames or []]
+        return [
+            (row[zip_column], float(row[lat_column]), float(row[lon_column]))
+            for row in reader
+        ]
+
+
+def main(argv: Sequence[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Build the memory-mapped ZIP centroid index."
+    )
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        type=Path,
+        default=[ZIP5_SOURCE_PATH, ZIP3_SOURCE_PATH],
+        help="CSV/TSV files of ZIP5 or ZIP3 centroids, e.g. the Census ZCTA gazetteer.",
+    )
+    parser.add_argument("--output", type=Path, default=ZIP_INDEX_PATH)
+    parser.add_argument("--zip-column", default="zip")
+    parser.add_argument("--lat-column", default="latitude")
+    parser.add_argument("--lon-column", default="longitude")
+    parser.add_argument("--delimiter", default=",", help='e.g. "|" or TAB')
+    args = parser.parse_args(argv)
+    rows = []
+    for source in args.sources:
+        rows.extend(
+            read_centroid_rows(
+                source,
+                args.zip_column,
+                args.lat_column,
+                args.lon_column,
+                args.delimiter,
+            )
+        )
+    table = build_zip_index(rows)
+    np.save(args.output, table)
+    print(f"Wrote {len(table)} centroids to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,6 +25,7 @@ class FacilityEditorState(rx.State):
         facility = await self.get_var_value(self.selected_facility)
         if facility:
             self.edited_facility = facility.copy()
+            self.edited_facility.setdefault("lock_status", "none")
         else:
             self.edited_facility = None
 
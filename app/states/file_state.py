@@ -1,5 +1,11 @@
 import reflex as rx
-from app.states.map_state import MapState, Facility, FacilityType
+from app.states.map_state import (
+    MapState,
+    Facility,
+    FacilityType,
+    LOCK_STATUSES,
+    LockStatus,
+)
 import pandas as pd
 import pyarrow.parquet as pq
 import io
@@ -59,6 +65,9 @@ class FileState(rx.State):
                         ]
                     elif has_old_format:
                         facility_types = [row["facility_type"]]
+                    lock_status = str(row.get("lock_status", "none")).lower()
+                    if lock_status not in LOCK_STATUSES:
+                        lock_status = "none"
                     new_facility = Facility(
                         facility_id=str(pd.NA)
                         if pd.isna(row.get("facility_id"))
@@ -75,6 +84,7 @@ class FileState(rx.State):
                         latitude=float(row["latitude"]),
                         longitude=float(row["longitude"]),
                         is_active=bool(row.get("is_active", True)),
+                        lock_status=cast(LockStatus, lock_status),
                     )
                     new_facilities.append(new_facility)
                 map_state.add_facilities(new_facilities)
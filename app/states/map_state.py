@@ -6,6 +6,8 @@ from typing import Literal, TypedDict, cast
 FacilityType = Literal[
     "DC", "Cross-dock", "Last-mile", "Retail", "Factory", "Source Warehouse", "Port"
 ]
+LockStatus = Literal["none", "open", "closed"]
+LOCK_STATUSES: list[LockStatus] = ["none", "open", "closed"]
 
 
 class Facility(TypedDict):
@@ -22,6 +24,7 @@ class Facility(TypedDict):
     latitude: float
     longitude: float
     is_active: bool
+    lock_status: LockStatus
 
 
 class FacilityNode(TypedDict):
@@ -131,6 +134,7 @@ class MapState(rx.State):
                     latitude=port_data["lat"],
                     longitude=port_data["lng"],
                     is_active=True,
+                    lock_status="none",
                 )
                 self.facilities.append(new_port)
 
@@ -156,6 +160,7 @@ class MapState(rx.State):
             latitude=lat,
             longitude=lng,
             is_active=True,
+            lock_status="none",
         )
         self.facilities.append(new_facility)
 
@@ -4,6 +4,7 @@ import datetime
 import logging
 from typing import TypedDict
 from sqlmodel import text
+from app.engine.warm_start import forget_network
 
 
 class NetworkInfo(TypedDict):
@@ -82,6 +83,7 @@ class NetworkListState(rx.State):
             network_config_state = await self.get_state(NetworkConfigState)
             scenario_state = await self.get_state(ScenarioState)
             network_state = await self.get_state(NetworkState)
+            forget_network(self.router.session.client_token)
             map_state.facilities = json.loads(data_result.facilities_json)
             demand_set_state.demand_sets = json.loads(data_result.demand_sets_json)
             product_state.products = json.loads(data_result.products_json)
@@ -92,8 +94,8 @@ class NetworkListState(rx.State):
                 "transport_costs", []
             )
             network_config_state.truck_capacity = config_json.get("truck_capacity", {})
-            network_config_state.inbound_sources = config_json.get(
-                "inbound_sources", []
+            network_config_state.load_inbound_sources(
+                config_json.get("inbound_sources", [])
             )
             network_config_state.edge_overrides = config_json.get("edge_overrides", [])
             network_state.current_network_id = network_id
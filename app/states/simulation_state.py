@@ -1,28 +1,202 @@
 import reflex as rx
-from typing import TypedDict, Any
-import math
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable
+import asyncio
+import contextlib
+import datetime
+import functools
+import json
 import logging
-import itertools
-from app.states.map_state import MapState, Facility
+import math
+import numpy as np
+from sqlmodel import text
+from app.engine.jobs import (
+    SearchControl,
+    SearchStopped,
+    cancel_job,
+    finish_job,
+    start_job,
+)
+from app.engine.model import NetworkModel, compile_network, mode_cost_table
+from app.engine.optimization import (
+    BRUTE_FORCE,
+    DEFAULT_PARETO_PENALTIES,
+    OPTIMIZATION_MODES,
+    PARETO_FRONTIER,
+    IncumbentStream,
+    OptimizationResult,
+    ParetoPoint,
+    problem_columns,
+    solve_exact,
+)
+from app.engine.pool import SIMULATION_WORKERS, run_in_pool, run_in_process
+from app.engine.result_cache import (
+    SIMULATION_CACHE,
+    SIMULATION_CACHE_PERSIST,
+    SIMULATION_CACHE_TTL_DAYS,
+    simulation_key,
+    totals_from_json,
+    totals_to_json,
+)
+from app.engine.search import (
+    SearchRunner,
+    ShardTask,
+    optimization_problem,
+    run_search,
+)
+from app.engine.sensitivity import (
+    CostAggregates,
+    RateScenario,
+    cost_aggregates,
+    rate_sweep,
+    reprice,
+)
+from app.engine.progress import PROGRESS_INTERVAL_SECONDS, ProgressPublisher
+from app.engine.shared_matrix import SharedMatrix
+from app.engine.warm_start import (
+    COST_MATRIX_CACHE,
+    CachedMatrix,
+    build_cost_matrix,
+    recall_solution,
+    remember_solution,
+)
+from app.engine.simulation import (
+    SIMULATION_CHUNK_SIZE,
+    SimulationResult,
+    SimulationTotals,
+    chunk_ranges,
+    finalize_result,
+    merge_totals,
+    simulate_chunk,
+)
+from app.states.map_state import MapState
 from app.states.demand_state import DemandState
+from app.states.product_state import ProductState
 from app.states.network_config_state import NetworkConfigState
 
+STOP_GRACE_SECONDS = 1.0
+SIMULATION_JOB = "simulation"
+OPTIMIZATION_JOB = "optimization"
+
+
+def _parse_numbers(text: str) -> list[float]:
+    """Distinct numbers of a comma-separated list, ascending."""
+    return sorted({float(value) for value in text.split(",") if value.strip()})
+
+
+class _PoolRunner(SearchRunner):
+    """Runs the search in the process pool for a SimulationState.
+
+    Cost matrices come from the shared-memory cache, incumbents are pushed to
+    the page while shards run, and brute force checkpoints to the database.
+    """
+
+    workers = max(SIMULATION_WORKERS, 1)
+
+    def __init__(self, state: "SimulationState", cancel_event: Any, time_budget: float):
+        super().__init__(time_budget)
+        self.state = state
+        self.cancel_event = cancel_event
+
+    def start_control(self) -> SearchControl:
+        return SearchControl.start(self.cancel_event, self.time_budget)
+
+    @contextlib.asynccontextmanager
+    async def cost_matrices(
+        self,
+        models: list[NetworkModel],
+        candidates: np.ndarray,
+        facility_type: str,
+        control: SearchControl,
+    ) -> AsyncIterator[list[tuple[SharedMatrix, float]]]:
+        built = await asyncio.gather(
+            *(
+                self._shared_cost_matrix(model, candidates, facility_type, control)
+                for model in models
+            ),
+            return_exceptions=True,
+        )
+        try:
+            for matrix in built:
+                if isinstance(matrix, BaseException):
+                    raise matrix
+            yield [(search, baseline_cost) for _, search, baseline_cost in built]
+        finally:
+            for matrix in built:
+                if not isinstance(matrix, BaseException):
+                    COST_MATRIX_CACHE.checkin(matrix[0], matrix[1])
 
-class SimulationResult(TypedDict):
-    total_cost: float
-    cost_breakdown: dict[str, float]
-    service_levels: dict[str, float]
-    facility_utilization: dict[str, int]
-    avg_inbound_dist: float
-    avg_outbound_dist: float
-    total_demand_units: int
+    async def _shared_cost_matrix(
+        self,
+        model: NetworkModel,
+        candidates: np.ndarray,
+        facility_type: str,
+        control: SearchControl,
+    ) -> tuple[CachedMatrix, SharedMatrix, float]:
+        """The run's matrix built in a worker from this network's cached one."""
+        key = (model.network_key, model.service_penalty)
+        previous = COST_MATRIX_CACHE.checkout(key)
+        try:
+            entry, search, baseline_cost = await run_in_pool(
+                build_cost_matrix,
+                model,
+                problem_columns(model, candidates, facility_type),
+                len(candidates),
+                previous,
+                control,
+            )
+            COST_MATRIX_CACHE.store(key, entry)
+        finally:
+            COST_MATRIX_CACHE.checkin(previous)
+        return entry, search, baseline_cost
 
+    async def call(
+        self,
+        control: SearchControl,
+        stream: IncumbentStream,
+        fn: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        run = run_in_process if fn is solve_exact else run_in_pool
+        return await self.state._run_streaming(control, stream, run, fn, *args)
 
-class OptimizationResult(TypedDict):
-    optimal_facilities: list[str]
-    best_cost: float
-    baseline_cost: float
-    cost_savings: float
+    async def shards(
+        self,
+        control: SearchControl,
+        stream: IncumbentStream,
+        tasks: Iterable[ShardTask],
+        on_result: Callable[[int, Any], Awaitable[None]],
+        total_weight: float,
+        completed_weight: float = 0.0,
+    ):
+        await self.state._run_shards(
+            tasks, control, stream, on_result, total_weight, completed_weight
+        )
+
+    def warm_start(self, model: NetworkModel, candidates: np.ndarray) -> list[int]:
+        return recall_solution(
+            model.network_key,
+            self.state.candidate_facility_type,
+            model.facility_ids,
+            candidates,
+        )
+
+    async def resume(self, job_key: str) -> tuple[int, float, list[int]]:
+        return await self.state._load_checkpoint(job_key)
+
+    async def checkpoint(
+        self,
+        job_key: str,
+        next_rank: int,
+        total: int,
+        best_cost: float,
+        best_facilities: list[int],
+    ):
+        await self.state._save_checkpoint(
+            job_key, next_rank, total, best_cost, best_facilities
+        )
+
+    async def clear_checkpoint(self, job_key: str):
+        await self.state._clear_checkpoint(job_key)
 
 
 class SimulationState(rx.State):
@@ -35,168 +209,395 @@ class SimulationState(rx.State):
     optimization_result: OptimizationResult | None = None
     num_dcs_to_select: int = 5
     candidate_facility_type: str = "DC"
+    optimization_mode: str = OPTIMIZATION_MODES[0]
+    optimization_time_budget: float = 0.0
+    optimization_seed: int = 0
+    service_penalty: float = 0.0
+    pareto_penalties: str = DEFAULT_PARETO_PENALTIES
+    pareto_frontier: list[ParetoPoint] = []
+    rate_sweep_parcel: str = "0.25, 0.5, 0.75, 1.0"
+    rate_sweep_tl: str = "2.0, 3.0, 4.0"
+    rate_sweep_results: list[RateScenario] = []
+    simulation_chunk_size: int = SIMULATION_CHUNK_SIZE
+    _cost_aggregates: CostAggregates | None = None
 
-    def _haversine_distance(
-        self, lat1: float, lon1: float, lat2: float, lon2: float
-    ) -> float:
-        R = 3958.8
-        dLat = math.radians(lat2 - lat1)
-        dLon = math.radians(lon2 - lon1)
-        lat1 = math.radians(lat1)
-        lat2 = math.radians(lat2)
-        a = (
-            math.sin(dLat / 2) ** 2
-            + math.cos(lat1) * math.cos(lat2) * math.sin(dLon / 2) ** 2
-        )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        return R * c
-
-    async def _calculate_cost_for_facilities(self, facilities: list[Facility]):
+    async def _network_inputs(self) -> dict[str, Any]:
+        """compile_network arguments, copied so they can be read outside the lock."""
+        map_state = await self.get_state(MapState)
         demand_state = await self.get_state(DemandState)
+        product_state = await self.get_state(ProductState)
         network_config_state = await self.get_state(NetworkConfigState)
-        demands = demand_state.demands
-        transport_costs = network_config_state.transport_costs
-        total_cost = 0.0
-        cost_breakdown = {"inbound": 0.0, "outbound": 0.0}
-        service_levels = {"<24h": 0, "<48h": 0, ">=48h": 0}
-        facility_utilization = {f["facility_id"]: 0 for f in facilities}
-        total_inbound_dist, total_outbound_dist = (0, 0)
-        total_demand_units = sum((d["units_demanded"] for d in demands)) or 1
-        la_port_lat, la_port_lon = (33.7292, -118.262)
-        tl_cost = next(
-            (c["cost_per_mile"] for c in transport_costs if c["mode"] == "TL"), 3.0
-        )
-        parcel_cost = next(
-            (c["cost_per_mile"] for c in transport_costs if c["mode"] == "Parcel"), 0.5
-        )
-        for demand in demands:
-            facility = next(
-                (
-                    f
-                    for f in facilities
-                    if f["facility_id"] == demand["assigned_facility_id"]
-                ),
-                None,
-            )
-            if not facility:
-                continue
-            inbound_dist = self._haversine_distance(
-                la_port_lat, la_port_lon, facility["latitude"], facility["longitude"]
-            )
-            inbound_cost = inbound_dist * tl_cost * demand["units_demanded"]
-            total_cost += inbound_cost
-            cost_breakdown["inbound"] += inbound_cost
-            total_inbound_dist += inbound_dist * demand["units_demanded"]
-            outbound_dist = 50
-            outbound_cost = outbound_dist * parcel_cost * demand["units_demanded"]
-            total_cost += outbound_cost
-            cost_breakdown["outbound"] += outbound_cost
-            total_outbound_dist += outbound_dist * demand["units_demanded"]
-            if outbound_dist <= 500:
-                service_levels["<24h"] += demand["units_demanded"]
-            elif 500 < outbound_dist <= 1000:
-                service_levels["<48h"] += demand["units_demanded"]
-            else:
-                service_levels[">=48h"] += demand["units_demanded"]
-            facility_utilization[facility["facility_id"]] += demand["units_demanded"]
-        service_level_pct = {
-            k: v / total_demand_units * 100 for k, v in service_levels.items()
-        }
         return {
-            "total_cost": total_cost,
-            "cost_breakdown": cost_breakdown,
-            "service_levels": service_level_pct,
-            "facility_utilization": facility_utilization,
-            "avg_inbound_dist": total_inbound_dist / total_demand_units,
-            "avg_outbound_dist": total_outbound_dist / total_demand_units,
-            "total_demand_units": total_demand_units,
+            "facilities": [dict(f) for f in map_state.facilities],
+            "demands": [dict(d) for d in demand_state.demands],
+            "products": [dict(p) for p in product_state.products],
+            "transport_costs": [dict(t) for t in network_config_state.transport_costs],
+            "edge_overrides": [dict(e) for e in network_config_state.edge_overrides],
+            "inbound_sources": [dict(s) for s in network_config_state.inbound_sources],
+            "network_key": self.router.session.client_token,
+            "assign_facility_type": self.candidate_facility_type,
+            "service_penalty": self.service_penalty,
         }
 
+    async def _compile_network(self) -> NetworkModel:
+        """Snapshot the inputs under the state lock, then compile off the event loop.
+
+        Runs in a thread rather than the pool so the main-process facility
+        index cache stays warm for auto-assignment.
+        """
+        async with self:
+            inputs = await self._network_inputs()
+        return await asyncio.to_thread(compile_network, **inputs)
+
+    def _job_key(self, kind: str) -> tuple[str, str]:
+        return (self.router.session.client_token, kind)
+
+    @rx.event
+    def cancel_run(self, kind: str):
+        if cancel_job(self._job_key(kind)):
+            return rx.toast.info("Cancelling...")
+
     @rx.event(background=True)
     async def run_simulation(self):
         async with self:
             self.is_simulating = True
             self.simulation_progress = 0
             self.simulation_result = None
+            self.rate_sweep_results = []
+            self._cost_aggregates = None
             self.error_message = ""
+        job_key = self._job_key(SIMULATION_JOB)
+        cancel_event = start_job(job_key)
+        pending = {}
         try:
-            async with self:
-                map_state = await self.get_state(MapState)
-                facilities = map_state.facilities
-                demand_state = await self.get_state(DemandState)
-                if not facilities or not demand_state.demands:
+            model = await self._compile_network()
+            if not model.num_facilities or not model.num_demands:
+                async with self:
                     self.error_message = "No facilities or demand points to simulate."
                     self.is_simulating = False
+                return
+            cache_key = simulation_key(model)
+            totals = SIMULATION_CACHE.get(cache_key)
+            if totals is None and SIMULATION_CACHE_PERSIST:
+                totals = await self._load_cached_totals(cache_key)
+                if totals is not None:
+                    SIMULATION_CACHE.put(cache_key, totals)
+            if totals is None:
+                chunks = chunk_ranges(model.num_demands, self.simulation_chunk_size)
+                pending = {
+                    asyncio.ensure_future(
+                        run_in_pool(simulate_chunk, model.demand_slice(start, stop))
+                    ): i
+                    for i, (start, stop) in enumerate(chunks)
+                }
+                chunk_totals = [None] * len(chunks)
+                publisher = ProgressPublisher()
+                while pending and not cancel_event.is_set():
+                    done, _ = await asyncio.wait(
+                        pending, timeout=PROGRESS_INTERVAL_SECONDS
+                    )
+                    for future in done:
+                        chunk_totals[pending.pop(future)] = future.result()
+                    progress = (len(chunks) - len(pending)) / len(chunks) * 100
+                    if publisher.should_publish(progress):
+                        async with self:
+                            self.simulation_progress = progress
+                if cancel_event.is_set():
+                    async with self:
+                        self.error_message = "Simulation cancelled."
                     return
-                self.simulation_progress = 50
-            result = await self._calculate_cost_for_facilities(facilities)
+                totals = functools.reduce(merge_totals, chunk_totals)
+                SIMULATION_CACHE.put(cache_key, totals)
+                if SIMULATION_CACHE_PERSIST:
+                    await self._save_cached_totals(cache_key, totals)
+            result = finalize_result(model, totals)
+            aggregates = cost_aggregates(model, totals)
             async with self:
                 self.simulation_result = result
+                self._cost_aggregates = aggregates
                 self.simulation_progress = 100
         except Exception as e:
             logging.exception(f"Simulation failed: {e}")
             async with self:
                 self.error_message = f"An error occurred: {e}"
         finally:
+            for future in pending:
+                future.cancel()
+            finish_job(job_key)
             async with self:
                 self.is_simulating = False
 
+    @rx.event
+    async def reprice_simulation(self):
+        """Re-cost the current result at the configured rates without re-simulating."""
+        if self.simulation_result is None or self._cost_aggregates is None:
+            return
+        network_config_state = await self.get_state(NetworkConfigState)
+        self.simulation_result = reprice(
+            self._cost_aggregates,
+            self.simulation_result,
+            mode_cost_table(network_config_state.transport_costs),
+        )
+
+    @rx.event
+    async def run_rate_sweep(self):
+        if self.simulation_result is None or self._cost_aggregates is None:
+            return rx.toast.error("Run a simulation before sweeping rates.")
+        try:
+            grid = {
+                "Parcel": _parse_numbers(self.rate_sweep_parcel),
+                "TL": _parse_numbers(self.rate_sweep_tl),
+            }
+        except ValueError:
+            return rx.toast.error("Rates must be numbers separated by commas.")
+        network_config_state = await self.get_state(NetworkConfigState)
+        self.rate_sweep_results = rate_sweep(
+            self._cost_aggregates,
+            self.simulation_result,
+            mode_cost_table(network_config_state.transport_costs),
+            {mode: rates for mode, rates in grid.items() if rates},
+        )
+
+    async def _publish_incumbent(
+        self, control: SearchControl, stream: IncumbentStream, progress: float
+    ):
+        for cost, facilities in control.drain():
+            stream.offer(cost, facilities)
+        if stream.should_publish(progress):
+            async with self:
+                self.optimization_progress = progress
+                if stream.facilities:
+                    self.optimization_result = stream.as_result("running")
+
+    async def _run_streaming(
+        self,
+        control: SearchControl,
+        stream: IncumbentStream,
+        run: Callable[..., Awaitable[Any]],
+        fn: Callable[..., Any],
+        *args: Any,
+    ) -> Any:
+        """One call via run, publishing the incumbents it reports while it runs.
+
+        Once control stops the search the call gets STOP_GRACE_SECONDS to
+        return; after that it is abandoned (and cancelled) and SearchStopped
+        is raised.
+        """
+        future = asyncio.ensure_future(run(fn, *args))
+        try:
+            while not future.done():
+                if control.stopped():
+                    await asyncio.wait([future], timeout=STOP_GRACE_SECONDS)
+                    if not future.done():
+                        raise SearchStopped()
+                    break
+                await asyncio.wait([future], timeout=PROGRESS_INTERVAL_SECONDS)
+                await self._publish_incumbent(
+                    control, stream, self.optimization_progress
+                )
+            return future.result()
+        finally:
+            future.cancel()
+
+    async def _run_shards(
+        self,
+        tasks: Iterable[tuple[Callable[..., Any], tuple, float]],
+        control: SearchControl,
+        stream: IncumbentStream,
+        on_result: Callable[[int, Any], Awaitable[None]],
+        total_weight: float,
+        completed_weight: float = 0.0,
+    ):
+        """Run (fn, args, weight) tasks in the pool with bounded fan-out.
+
+        Tasks are pulled lazily, so only a few are ever materialized at once;
+        on_result sees each result with its task index as it completes.
+        """
+        queued = enumerate(tasks)
+        pending = {}
+        try:
+            while not control.stopped():
+                while len(pending) < max(SIMULATION_WORKERS, 1) * 2 and (
+                    task := next(queued, None)
+                ):
+                    i, (fn, args, weight) = task
+                    pending[asyncio.ensure_future(run_in_pool(fn, *args))] = (i, weight)
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=PROGRESS_INTERVAL_SECONDS)
+                for future in sorted(done, key=lambda future: pending[future][0]):
+                    i, weight = pending.pop(future)
+                    await on_result(i, future.result())
+                    completed_weight += weight
+                await self._publish_incumbent(
+                    control, stream, completed_weight / (total_weight or 1) * 100
+                )
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _load_cached_totals(self, cache_key: str) -> SimulationTotals | None:
+        try:
+            async with rx.asession() as session:
+                result = await session.exec(
+                    text(
+                        "SELECT totals_json FROM simulation_cache WHERE cache_key = :cache_key"
+                    ),
+                    {"cache_key": cache_key},
+                )
+                row = result.first()
+            return totals_from_json(row[0]) if row else None
+        except Exception as e:
+            logging.exception(f"Failed to load cached simulation: {e}")
+            return None
+
+    async def _save_cached_totals(self, cache_key: str, totals: SimulationTotals):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            async with rx.asession() as session:
+                await session.exec(
+                    text(
+                        "INSERT INTO simulation_cache (cache_key, totals_json, created_at) VALUES (:cache_key, :totals_json, :created_at) ON CONFLICT (cache_key) DO UPDATE SET totals_json = excluded.totals_json, created_at = excluded.created_at"
+                    ),
+                    {
+                        "cache_key": cache_key,
+                        "totals_json": totals_to_json(totals),
+                        "created_at": now,
+                    },
+                )
+                await session.exec(
+                    text("DELETE FROM simulation_cache WHERE created_at < :cutoff"),
+                    {
+                        "cutoff": now
+                        - datetime.timedelta(days=SIMULATION_CACHE_TTL_DAYS)
+                    },
+                )
+                await session.commit()
+        except Exception as e:
+            logging.exception(f"Failed to cache simulation: {e}")
+
+    async def _load_checkpoint(self, job_key: str) -> tuple[int, float, list[int]]:
+        try:
+            async with rx.asession() as session:
+                result = await session.exec(
+                    text(
+                        "SELECT next_rank, best_cost, best_facilities_json FROM optimization_checkpoint WHERE job_key = :job_key"
+                    ),
+                    {"job_key": job_key},
+                )
+                row = result.first()
+        except Exception as e:
+            logging.exception(f"Failed to load optimization checkpoint: {e}")
+            row = None
+        if not row:
+            return 0, float("inf"), []
+        best_cost = float("inf") if row[1] is None else row[1]
+        return row[0], best_cost, json.loads(row[2])
+
+    async def _save_checkpoint(
+        self,
+        job_key: str,
+        next_rank: int,
+        total: int,
+        best_cost: float,
+        best_facilities: list[int],
+    ):
+        try:
+            async with rx.asession() as session:
+                await session.exec(
+                    text(
+                        "INSERT INTO optimization_checkpoint (job_key, mode, next_rank, total_combinations, best_cost, best_facilities_json, updated_at) VALUES (:job_key, :mode, :next_rank, :total, :best_cost, :best_facilities_json, :updated_at) ON CONFLICT (job_key) DO UPDATE SET next_rank = excluded.next_rank, best_cost = excluded.best_cost, best_facilities_json = excluded.best_facilities_json, updated_at = excluded.updated_at"
+                    ),
+                    {
+                        "job_key": job_key,
+                        "mode": BRUTE_FORCE,
+                        "next_rank": next_rank,
+                        "total": total,
+                        "best_cost": best_cost if math.isfinite(best_cost) else None,
+                        "best_facilities_json": json.dumps(best_facilities),
+                        "updated_at": datetime.datetime.now(datetime.timezone.utc),
+                    },
+                )
+                await session.commit()
+        except Exception as e:
+            logging.exception(f"Failed to save optimization checkpoint: {e}")
+
+    async def _clear_checkpoint(self, job_key: str):
+        try:
+            async with rx.asession() as session:
+                await session.exec(
+                    text(
+                        "DELETE FROM optimization_checkpoint WHERE job_key = :job_key"
+                    ),
+                    {"job_key": job_key},
+                )
+                await session.commit()
+        except Exception as e:
+            logging.exception(f"Failed to clear optimization checkpoint: {e}")
+
     @rx.event(background=True)
     async def run_optimization(self):
         async with self:
             self.is_optimizing = True
             self.optimization_progress = 0
             self.optimization_result = None
+            self.pareto_frontier = []
             self.error_message = ""
+        job_key = self._job_key(OPTIMIZATION_JOB)
+        cancel_event = start_job(job_key)
         try:
-            async with self:
-                map_state = await self.get_state(MapState)
-                all_facilities = map_state.facilities
-            candidate_facilities = [
-                f
-                for f in all_facilities
-                if f["facility_type"] == self.candidate_facility_type
-            ]
-            if len(candidate_facilities) < self.num_dcs_to_select:
+            model = await self._compile_network()
+            penalties: list[float] = []
+            if self.optimization_mode == PARETO_FRONTIER:
+                try:
+                    penalties = _parse_numbers(self.pareto_penalties)
+                except ValueError:
+                    async with self:
+                        self.error_message = (
+                            "Penalty weights must be numbers separated by commas."
+                        )
+                    return
+            try:
+                problem = optimization_problem(
+                    model,
+                    self.candidate_facility_type,
+                    self.num_dcs_to_select,
+                    self.optimization_mode,
+                )
+            except ValueError as e:
                 async with self:
-                    self.error_message = (
-                        "Not enough candidate facilities to run optimization."
-                    )
-                    self.is_optimizing = False
+                    self.error_message = str(e)
                 return
-            baseline_result = await self._calculate_cost_for_facilities(all_facilities)
-            baseline_cost = baseline_result["total_cost"]
-            best_cost = float("inf")
-            best_combination = None
-            combinations = list(
-                itertools.combinations(candidate_facilities, self.num_dcs_to_select)
+            outcome = await run_search(
+                problem,
+                _PoolRunner(self, cancel_event, self.optimization_time_budget),
+                self.optimization_seed,
+                penalties,
             )
-            for i, combo in enumerate(combinations):
-                current_network = [
-                    f
-                    for f in all_facilities
-                    if f["facility_type"] != self.candidate_facility_type
-                ] + list(combo)
-                result = await self._calculate_cost_for_facilities(current_network)
-                if result["total_cost"] < best_cost:
-                    best_cost = result["total_cost"]
-                    best_combination = [f["site_name"] for f in combo]
-                async with self:
-                    self.optimization_progress = (i + 1) / len(combinations) * 100
-                yield
-            if best_combination:
-                async with self:
-                    self.optimization_result = {
-                        "optimal_facilities": best_combination,
-                        "best_cost": best_cost,
-                        "baseline_cost": baseline_cost,
-                        "cost_savings": baseline_cost - best_cost,
-                    }
+            stream = outcome.stream
+            if stream.facilities:
+                remember_solution(
+                    problem.model.network_key,
+                    self.candidate_facility_type,
+                    [problem.model.facility_ids[j] for j in stream.facilities],
+                )
+            async with self:
+                if stream.facilities:
+                    self.optimization_result = stream.as_result(
+                        outcome.status, outcome.optimality_gap
+                    )
+                    self.optimization_progress = 100
+                if self.optimization_mode == PARETO_FRONTIER:
+                    self.pareto_frontier = outcome.pareto_frontier
+                    self.optimization_progress = 100
+                if outcome.error:
+                    self.error_message = outcome.error
         except Exception as e:
             logging.exception(f"Optimization failed: {e}")
             async with self:
                 self.error_message = f"An error occurred during optimization: {e}"
         finally:
+            finish_job(job_key)
             async with self:
                 self.is_optimizing = False
 
@@ -211,4 +612,16 @@ class SimulationState(rx.State):
             self.simulation_result["facility_utilization"].items(),
             key=lambda item: item[1],
             reverse=True,
+        )[:5]
+
+    @rx.var
+    def sorted_inbound_volume(self) -> list[tuple[str, int]]:
+        if not self.simulation_result or not self.simulation_result.get(
+            "inbound_volume"
+        ):
+            return []
+        return sorted(
+            self.simulation_result["inbound_volume"].items(),
+            key=lambda item: item[1],
+            reverse=True,
         )[:5]
\ No newline at end of file
@@ -0,0 +1,345 @@
+"""Benchmark simulation, optimization, ingestion and save/load on synthetic networks.
+
+    python -m benchmarks.run                # full grid
+    python -m benchmarks.run --quick        # smallest sizes only
+    python -m benchmarks.run --only simulate,optimize/Greedy + Interchange
+
+Every benchmark runs on a network generated from --seed, without network or
+database access. Engine caches are cleared before each measurement, so the
+numbers are for cold runs. Wall time comes from an untraced run and peak
+memory from a second run under tracemalloc. Each invocation is appended to
+the JSON history file and compared with the previous entry.
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import math
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Iterator, Sequence, TypedDict
+import numpy as np
+import pandas as pd
+from app.engine.api import OptimizationSettings, Scenario, optimize
+from app.engine.files import load_scenario
+from app.engine.model import NetworkModel
+from app.engine.optimization import (
+    BRUTE_FORCE,
+    BRUTE_FORCE_MAX_COMBINATIONS,
+    OPTIMIZATION_MODES,
+    optimization_candidates,
+)
+from app.engine.ports import with_port_coordinates
+from app.engine.result_cache import SIMULATION_CACHE
+from app.engine.simulation import simulate
+from benchmarks.synthetic import synthetic_scenario
+
+DEMAND_SIZES = (10, 1_000, 100_000)
+CANDIDATE_SIZES = (10, 100, 1_000)
+HISTORY_PATH = Path(__file__).resolve().parent / "history.json"
+MAX_COST_CELLS = 20_000_000
+PARETO_PENALTIES = (0.0, 100.0)
+
+_network_keys = itertools.count()
+
+
+class Measurement(TypedDict):
+    benchmark: str
+    demand_points: int
+    candidates: int
+    wall_seconds: float | None
+    peak_memory_mb: float | None
+    throughput: float | None
+    throughput_unit: str
+    status: str
+
+
+def reset_caches():
+    SIMULATION_CACHE.clear()
+
+
+def compile_fresh(scenario: Scenario) -> NetworkModel:
+    """Compile under a network key no cache has seen."""
+    return replace(scenario, name=f"{scenario.name}#{next(_network_keys)}").compile()
+
+
+def measure(
+    setup: Callable[[], Any],
+    run: Callable[[Any], Any],
+    items: int,
+    trace_memory: bool,
+) -> tuple[float, float | None, float, str]:
+    """Wall time, peak MB, items/s and status of run(setup()); setup is not timed.
+
+    A run reports a status other than "ok" by returning it as a string.
+    """
+    prepared = setup()
+    reset_caches()
+    started = time.perf_counter()
+    outcome = run(prepared)
+    wall = time.perf_counter() - started
+    status = outcome if isinstance(outcome, str) else "ok"
+    peak = None
+    if trace_memory:
+        prepared = setup()
+        reset_caches()
+        tracemalloc.start()
+        try:
+            run(prepared)
+            peak = tracemalloc.get_traced_memory()[1] / 1024**2
+        finally:
+            tracemalloc.stop()
+    return wall, peak, items / wall if wall > 0 else math.inf, status
+
+
+def optimization_run(
+    mode: str, num_dcs: int, time_budget: float
+) -> Callable[[NetworkModel], str | None]:
+    def run(model: NetworkModel) -> str | None:
+        _, candidates = optimization_candidates(model, "DC")
+        settings = OptimizationSettings(
+            mode=mode,
+            num_dcs=min(num_dcs, len(candidates) - 1),
+            time_budget=time_budget,
+            pareto_penalties=PARETO_PENALTIES,
+        )
+        outcome = optimize(model, "DC", settings)
+        return "time_limit" if outcome.status == "time_limit" else None
+
+    return run
+
+
+def ingestion_setup(scenario: Scenario, suffix: str) -> Callable[[], Path]:
+    workdir = tempfile.TemporaryDirectory(prefix="bench-ingest-")
+
+    def setup() -> Path:
+        directory = Path(workdir.name) / scenario.name
+        directory.mkdir(exist_ok=True)
+        for stem, records in (
+            ("facilities", scenario.facilities),
+            ("demand", scenario.demands),
+        ):
+            df = pd.DataFrame(records)
+            if stem == "facilities":
+                df["facility_types"] = df["facility_types"].str.join(",")
+            if suffix == ".csv":
+                df.to_csv(directory / f"{stem}.csv", index=False)
+            else:
+                df.to_parquet(directory / f"{stem}.parquet", index=False)
+        return directory
+
+    return setup
+
+
+def save_load(scenario: Scenario) -> None:
+    """The round trip NetworkState.save_network / load_network make through JSON.
+
+    Covers every saved column, including config_json, whose inbound sources
+    go through the same coordinate backfill load_inbound_sources applies.
+    """
+    saved = {
+        "facilities_json": json.dumps(list(scenario.facilities)),
+        "demand_sets_json": json.dumps({"default": list(scenario.demands)}),
+        "products_json": json.dumps(list(scenario.products)),
+        "config_json": json.dumps(
+            {
+                "transport_costs": list(scenario.transport_costs),
+                "truck_capacity": {},
+                "inbound_sources": list(scenario.inbound_sources),
+                "edge_overrides": list(scenario.edge_overrides),
+            }
+        ),
+        "scenarios_json": json.dumps([]),
+    }
+    loaded = {column: json.loads(value) for column, value in saved.items()}
+    with_port_coordinates(loaded["config_json"].get("inbound_sources", []))
+
+
+def benchmarks(
+    demands: int, candidates: int, args: argparse.Namespace
+) -> Iterator[tuple[str, Callable[[], Any], Callable[[Any], Any], int, str]]:
+    scenario = synthetic_scenario(demands, candidates, args.seed)
+    rows = demands + candidates
+    yield "compile", lambda: scenario, compile_fresh, demands, "demand points/s"
+    yield (
+        "simulate",
+        lambda: compile_fresh(scenario),
+        simulate,
+        demands,
+        "demand points/s",
+    )
+    for mode in OPTIMIZATION_MODES:
+        yield (
+            f"optimize/{mode}",
+            lambda: compile_fresh(scenario),
+            optimization_run(mode, args.num_dcs, args.time_budget),
+            demands * candidates,
+            "cost cells/s",
+        )
+    for suffix in (".csv", ".parquet"):
+        yield (
+            f"ingest/{suffix[1:]}",
+            ingestion_setup(scenario, suffix),
+            load_scenario,
+            rows,
+            "rows/s",
+        )
+    yield "save_load", lambda: scenario, save_load, rows, "rows/s"
+
+
+def skip_reason(
+    name: str, demands: int, candidates: int, args: argparse.Namespace
+) -> str | None:
+    if not name.startswith("optimize/"):
+        return None
+    if demands * candidates > args.max_cells:
+        return f"skipped: cost matrix over {args.max_cells:,} cells"
+    p = min(args.num_dcs, candidates - 1)
+    if name == f"optimize/{BRUTE_FORCE}" and (
+        math.comb(candidates, p) > BRUTE_FORCE_MAX_COMBINATIONS
+    ):
+        return f"skipped: over {BRUTE_FORCE_MAX_COMBINATIONS:,} combinations"
+    return None
+
+
+def run_suite(args: argparse.Namespace) -> list[Measurement]:
+    demand_sizes = DEMAND_SIZES[:2] if args.quick else DEMAND_SIZES
+    candidate_sizes = CANDIDATE_SIZES[:2] if args.quick else CANDIDATE_SIZES
+    selected = set(args.only.split(",")) if args.only else None
+    results: list[Measurement] = []
+    for demands, candidates in itertools.product(demand_sizes, candidate_sizes):
+        for name, setup, run, items, unit in benchmarks(demands, candidates, args):
+            if selected is not None and name not in selected:
+                continue
+            measurement: Measurement = {
+                "benchmark": name,
+                "demand_points": demands,
+                "candidates": candidates,
+                "wall_seconds": None,
+                "peak_memory_mb": None,
+                "throughput": None,
+                "throughput_unit": unit,
+                "status": "",
+            }
+            reason = skip_reason(name, demands, candidates, args)
+            if reason is not None:
+                measurement["status"] = reason
+            else:
+                try:
+                    wall, peak, throughput, status = measure(
+                        setup, run, items, not args.no_memory
+                    )
+                    measurement.update(
+                        wall_seconds=wall,
+                        peak_memory_mb=peak,
+                        throughput=throughput,
+                        status=status,
+                    )
+                except Exception as e:
+                    measurement["status"] = f"error: {e}"
+            print(format_row(measurement), flush=True)
+            results.append(measurement)
+    return results
+
+
+def format_row(m: Measurement, previous: Measurement | None = None) -> str:
+    wall = "-" if m["wall_seconds"] is None else f"{m['wall_seconds']:9.3f}s"
+    peak = "-" if m["peak_memory_mb"] is None else f"{m['peak_memory_mb']:8.1f}MB"
+    throughput = (
+        "-"
+        if m["throughput"] is None
+        else f"{m['throughput']:,.0f} {m['throughput_unit']}"
+    )
+    change = ""
+    if previous is not None and previous["wall_seconds"] and m["wall_seconds"]:
+        change = f" ({m['wall_seconds'] / previous['wall_seconds']:.2f}x prev)"
+    return (
+        f"{m['benchmark']:<34} {m['demand_points']:>7} x {m['candidates']:<5} "
+        f"{wall:>11} {peak:>11}  {throughput}  {m['status']}{change}"
+    )
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def append_history(
+    path: Path, args: argparse.Namespace, results: list[Measurement]
+) -> dict[tuple[str, int, int], Measurement]:
+    """Append this run; return the previous run's measurements by benchmark and size."""
+    history = json.loads(path.read_text()) if path.exists() else []
+    previous = {
+        (m["benchmark"], m["demand_points"], m["candidates"]): m
+        for m in (history[-1]["results"] if history else [])
+    }
+    history.append(
+        {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "num_dcs": args.num_dcs,
+            "time_budget": args.time_budget,
+            "results": results,
+        }
+    )
+    path.write_text(json.dumps(history, indent=1))
+    return previous
+
+
+def main(argv: Sequence[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Offline benchmarks on seeded synthetic networks.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--num-dcs", type=int, default=3)
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=30.0,
+        help="per optimization run, in seconds; runs that hit it report time_limit",
+    )
+    parser.add_argument(
+        "--max-cells",
+        type=int,
+        default=MAX_COST_CELLS,
+        help="skip optimizations whose demand x candidate matrix is larger",
+    )
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--only", help="comma-separated benchmark names")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced run")
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    args = parser.parse_args(argv)
+    results = run_suite(args)
+    previous = append_history(args.history, args, results)
+    comparable = [
+        (m, previous.get((m["benchmark"], m["demand_points"], m["candidates"])))
+        for m in results
+    ]
+    if any(p is not None for _, p in comparable):
+        print("\nCompared with the previous run:")
+        for m, p in comparable:
+            print(format_row(m, p))
+    print(f"\nAppended {len(results)} results to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import numpy as np
+from app.engine.api import Scenario
+from app.engine.model import DEFAULT_MODE_COSTS
+from app.engine.zip_index import ZIP3_KEY_OFFSET, load_zip_index, resolve_zip_codes
+
+NUM_PRODUCTS = 5
+NUM_INBOUND_SOURCES = 5
+LAT_RANGE = (25.0, 48.0)
+LON_RANGE = (-124.0, -70.0)
+DEMAND_JITTER_DEGREES = 0.1
+
+
+def zip_codes() -> list[str]:
+    """Every ZIP in the bundled centroid index, so each demand point resolves."""
+    return [
+        f"{key - ZIP3_KEY_OFFSET:03d}" if key >= ZIP3_KEY_OFFSET else f"{key:05d}"
+        for key in load_zip_index()["key"]
+    ]
+
+
+def synthetic_scenario(
+    num_demands: int, num_candidates: int, seed: int = 0
+) -> Scenario:
+    """Reproducible network: random DC candidates, demand around ZIPs the index resolves.
+
+    Every demand point carries its own coordinates, jittered around its ZIP
+    centroid, so no two share a cost matrix row.
+    """
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(*LAT_RANGE, num_candidates)
+    lon = rng.uniform(*LON_RANGE, num_candidates)
+    facilities = [
+        {
+            "facility_id": f"dc-{i}",
+            "facility_types": ["DC"],
+            "site_name": f"DC {i}",
+            "latitude": float(lat[i]),
+            "longitude": float(lon[i]),
+            "is_active": True,
+            "lock_status": "none",
+        }
+        for i in range(num_candidates)
+    ]
+    products = [
+        {
+            "product_id": f"p-{i}",
+            "weight_per_unit": float(rng.uniform(0.5, 50.0)),
+            "cube_per_unit": float(rng.uniform(0.1, 5.0)),
+        }
+        for i in range(NUM_PRODUCTS)
+    ]
+    codes = np.array(zip_codes())
+    demand_zip = rng.choice(codes, num_demands)
+    demand_lat, demand_lon = resolve_zip_codes(demand_zip)
+    demand_lat += rng.uniform(-1, 1, num_demands) * DEMAND_JITTER_DEGREES
+    demand_lon += rng.uniform(-1, 1, num_demands) * DEMAND_JITTER_DEGREES
+    demand_product = rng.integers(NUM_PRODUCTS, size=num_demands)
+    demand_units = rng.integers(1, 100, size=num_demands)
+    demands = [
+        {
+            "demand_id": f"d-{i}",
+            "zip_code": str(demand_zip[i]),
+            "latitude": float(demand_lat[i]),
+            "longitude": float(demand_lon[i]),
+            "product_id": f"p-{demand_product[i]}",
+            "units_demanded": int(demand_units[i]),
+            "assigned_facility_id": "",
+        }
+        for i in range(num_demands)
+    ]
+    source_lat = rng.uniform(*LAT_RANGE, NUM_INBOUND_SOURCES)
+    source_lon = rng.uniform(*LON_RANGE, NUM_INBOUND_SOURCES)
+    inbound_sources = [
+        {
+            "source_id": f"port-{i}",
+            "name": f"Port {i}",
+            "location": "",
+            "latitude": float(source_lat[i]),
+            "longitude": float(source_lon[i]),
+        }
+        for i in range(NUM_INBOUND_SOURCES)
+    ]
+    return Scenario(
+        name=f"synthetic-{num_demands}x{num_candidates}-{seed}",
+        facilities=facilities,
+        demands=demands,
+        products=products,
+        transport_costs=[
+            {"mode": mode, "cost_per_mile": cost}
+            for mode, cost in DEFAULT_MODE_COSTS.items()
+        ],
+        inbound_sources=inbound_sources,
+    )
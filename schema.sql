@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS optimization_checkpoint (
+    job_key TEXT PRIMARY KEY,
+    mode TEXT NOT NULL,
+    next_rank BIGINT NOT NULL,
+    total_combinations BIGINT NOT NULL,
+    best_cost DOUBLE PRECISION,
+    best_facilities_json TEXT NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS simulation_cache (
+    cache_key TEXT PRIMARY KEY,
+    totals_json TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS simulation_cache_created_at ON simulation_cache (created_at);
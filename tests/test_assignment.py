@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.engine.assignment import FacilityIndex, nearest_facility_ids
+from app.engine.geo import haversine_matrix
+
+
+def random_points(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray]:
+    return rng.uniform(25, 48, n), rng.uniform(-124, -70, n)
+
+
+def brute_force_nearest(ids, lat, lon, query_lat, query_lon) -> list[str]:
+    miles = haversine_matrix(query_lat, query_lon, lat, lon)
+    return [ids[j] for j in miles.argmin(axis=1)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_nearest_matches_brute_force_through_edits(seed):
+    rng = np.random.default_rng(seed)
+    ids = [f"f{i}" for i in range(40)]
+    lat, lon = random_points(rng, len(ids))
+    index = FacilityIndex(ids, lat, lon)
+    query_lat, query_lon = random_points(rng, 500)
+    points = dict(zip(ids, zip(lat, lon)))
+    for step in range(60):
+        facility_id = f"f{rng.integers(60)}"
+        if facility_id in points and len(points) > 1 and step % 3:
+            del points[facility_id]
+            index.remove(facility_id)
+        else:
+            points[facility_id] = tuple(float(x[0]) for x in random_points(rng, 1))
+            index.add(facility_id, *points[facility_id])
+        current = list(points)
+        coords = np.array([points[f] for f in current])
+        assert index.nearest(query_lat, query_lon).tolist() == brute_force_nearest(
+            current, coords[:, 0], coords[:, 1], query_lat, query_lon
+        )
+
+
+def test_concurrent_queries_see_their_own_facilities():
+    rng = np.random.default_rng(0)
+    query_lat, query_lon = random_points(rng, 2_000)
+    networks = []
+    for n in (30, 200):
+        ids = [f"f{i}" for i in range(n)]
+        lat, lon = random_points(rng, n)
+        expected = brute_force_nearest(ids, lat, lon, query_lat, query_lon)
+        networks.append((ids, lat, lon, expected))
+
+    def query(i: int) -> bool:
+        ids, lat, lon, expected = networks[i % 2]
+        nearest = nearest_facility_ids(
+            "concurrent-test", "DC", ids, lat, lon, query_lat, query_lon
+        )
+        return nearest.tolist() == expected
+
+    with ThreadPoolExecutor(8) as pool:
+        assert all(pool.map(query, range(64)))
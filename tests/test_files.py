@@ -0,0 +1,30 @@
+import json
+from app.engine.files import load_scenario
+from app.engine.ports import TOP_25_US_PORTS
+
+
+def test_load_scenario_backfills_port_coordinates(tmp_path):
+    port = TOP_25_US_PORTS[0]
+    (tmp_path / "facilities.csv").write_text(
+        "facility_id,facility_type,latitude,longitude\ndc-0,DC,40.0,-90.0\n"
+    )
+    (tmp_path / "demand.csv").write_text("zip_code,units_demanded\n10001,5\n")
+    sources = [
+        {"source_id": "s1", "name": port["name"], "location": port["location"]},
+        {
+            "source_id": "s2",
+            "name": "Inland Depot",
+            "location": "Kansas City, MO",
+            "latitude": 39.1,
+            "longitude": -94.6,
+        },
+    ]
+    (tmp_path / "config.json").write_text(json.dumps({"inbound_sources": sources}))
+
+    loaded = load_scenario(tmp_path).inbound_sources
+    assert (loaded[0]["latitude"], loaded[0]["longitude"]) == (
+        port["latitude"],
+        port["longitude"],
+    )
+    assert loaded[1] == sources[1]
+    assert len(load_scenario(tmp_path).compile().source_names) == 2
@@ -0,0 +1,15 @@
+import pickle
+import pytest
+from benchmarks.synthetic import synthetic_scenario
+
+
+def test_model_lookup_tables_are_read_only_and_pickle():
+    model = synthetic_scenario(50, 3, seed=1).compile()
+    with pytest.raises(TypeError):
+        model.mode_costs["Parcel"] = 0.0
+    with pytest.raises(TypeError):
+        model.facility_index["new"] = 0
+    copy = pickle.loads(pickle.dumps(model))
+    assert copy.fingerprint() == model.fingerprint()
+    with pytest.raises(TypeError):
+        copy.edge_overrides[("a", "b")] = 1.0
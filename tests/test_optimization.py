@@ -0,0 +1,208 @@
+import itertools
+import math
+import numpy as np
+import pytest
+from dataclasses import replace
+from app.engine.api import OptimizationSettings, optimize
+from app.engine.optimization import (
+    BRANCH_AND_BOUND,
+    BRUTE_FORCE,
+    EXACT_MILP,
+    GREEDY_INTERCHANGE,
+    OPTIMIZATION_MODES,
+    PARETO_FRONTIER,
+    DeltaEvaluator,
+    branch_and_bound,
+    combination_blocks,
+    cost_columns,
+    evaluate_rank_range,
+    rank_shards,
+    selection_cost,
+    solve_branch_and_bound,
+    solve_exact,
+    solve_greedy_interchange,
+    transport_cost,
+    unrank_combination,
+)
+from app.engine.search import optimization_problem
+from benchmarks.synthetic import synthetic_scenario
+
+SEEDS = range(20)
+
+
+def approx(value: float):
+    return pytest.approx(value, rel=1e-9, abs=1e-6)
+
+
+def random_problem(seed: int) -> tuple[np.ndarray, np.ndarray, int]:
+    """A small cost matrix, candidate facility indices and p."""
+    rng = np.random.default_rng(seed)
+    m = int(rng.integers(4, 10))
+    cost = rng.uniform(1, 100, (int(rng.integers(5, 40)), m))
+    candidates = rng.permutation(3 * m)[:m]
+    return cost, candidates, int(rng.integers(1, m))
+
+
+def enumerated_optimum(
+    cost: np.ndarray, candidates: np.ndarray, p: int
+) -> tuple[float, list[int]]:
+    total, selection = min(
+        (selection_cost(cost, combo), combo)
+        for combo in itertools.combinations(range(cost.shape[1]), p)
+    )
+    return total, sorted(int(candidates[j]) for j in selection)
+
+
+@pytest.mark.parametrize("n", range(1, 9))
+def test_unrank_combination_matches_itertools(n):
+    for k in range(1, n + 1):
+        for rank, combo in enumerate(itertools.combinations(range(n), k)):
+            assert unrank_combination(rank, n, k) == list(combo)
+
+
+def test_combination_blocks_cover_rank_range():
+    n, k = 8, 3
+    combos = list(itertools.combinations(range(n), k))
+    for start, stop in [(0, len(combos)), (5, 17), (30, 31), (40, 40)]:
+        blocks = list(combination_blocks(n, k, start, stop, block_size=4))
+        rows = [tuple(row) for block in blocks for row in block.tolist()]
+        assert rows == combos[start:stop]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_delta_evaluator_matches_recomputation(seed):
+    rng = np.random.default_rng(seed)
+    cost = rng.uniform(1, 100, (30, 8))
+    evaluator = DeltaEvaluator(cost, [0, 3])
+    for _ in range(25):
+        selection = evaluator.selection
+        assert evaluator.total == approx(selection_cost(cost, selection))
+        np.testing.assert_allclose(evaluator.best, cost[:, selection].min(axis=1))
+        for j in range(cost.shape[1]):
+            if j in selection:
+                if len(selection) > 1:
+                    rest = [i for i in selection if i != j]
+                    assert evaluator.close_delta(j) == approx(
+                        selection_cost(cost, rest) - evaluator.total
+                    )
+                continue
+            assert evaluator.open_delta(j) == approx(
+                selection_cost(cost, selection + [j]) - evaluator.total
+            )
+            totals = evaluator.swap_totals(j)
+            for out in range(cost.shape[1]):
+                if out in selection:
+                    swapped = [i for i in selection if i != out] + [j]
+                    assert totals[out] == approx(selection_cost(cost, swapped))
+                else:
+                    assert totals[out] == np.inf
+        closed = np.flatnonzero(~evaluator.is_open)
+        if len(selection) > 1 and (not len(closed) or rng.random() < 0.5):
+            evaluator.close(int(rng.choice(selection)))
+        else:
+            evaluator.open(int(rng.choice(closed)))
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_exact_modes_agree_with_enumeration(seed):
+    cost, candidates, p = random_problem(seed)
+    optimum, facilities = enumerated_optimum(cost, candidates, p)
+
+    greedy_cost, _ = solve_greedy_interchange(cost, candidates, p)
+    assert greedy_cost >= optimum - 1e-9
+
+    bnb_cost, bnb_facilities = solve_branch_and_bound(cost, candidates, p, math.inf)
+    assert bnb_cost == approx(optimum)
+    assert sorted(bnb_facilities) == facilities
+
+    milp = solve_exact(cost, candidates, p)
+    assert milp.status == "optimal"
+    assert milp.total_cost == approx(optimum)
+    assert milp.facilities == facilities
+
+    total = math.comb(len(candidates), p)
+    shards = [
+        evaluate_rank_range(cost, candidates, p, start, stop)
+        for start, stop in rank_shards(0, total, max(total // 3, 1))
+    ]
+    best_cost, best = min(shards)
+    assert best_cost == approx(optimum)
+    assert sorted(best) == facilities
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_sharded_branch_and_bound_finds_optimum(seed):
+    cost, candidates, p = random_problem(seed)
+    optimum, _ = enumerated_optimum(cost, candidates, p)
+    roots = np.arange(cost.shape[1] - p + 1)
+    incumbent = math.inf
+    for shard in np.array_split(roots, 3):
+        total, _ = branch_and_bound(cost, p, incumbent, shard.tolist())
+        incumbent = min(incumbent, total)
+    assert incumbent == approx(optimum)
+
+
+def locked_network(locks: dict[int, str]):
+    scenario = synthetic_scenario(300, 9, seed=1)
+    facilities = [dict(f) for f in scenario.facilities]
+    for i, lock in locks.items():
+        facilities[i]["lock_status"] = lock
+    return replace(scenario, facilities=facilities).compile()
+
+
+def test_modes_agree_on_a_network():
+    model = locked_network({2: "open", 5: "closed"})
+    results = {
+        mode: optimize(model, "DC", OptimizationSettings(mode=mode, num_dcs=4))
+        for mode in (GREEDY_INTERCHANGE, EXACT_MILP, BRANCH_AND_BOUND, BRUTE_FORCE)
+    }
+    optimum = results[BRUTE_FORCE].stream
+    assert 2 in optimum.facilities or 2 in optimum.fixed_open
+    assert 5 not in optimum.facilities
+    for mode in (EXACT_MILP, BRANCH_AND_BOUND):
+        assert results[mode].stream.best_cost == approx(optimum.best_cost)
+        assert results[mode].stream.facilities == optimum.facilities
+    assert results[GREEDY_INTERCHANGE].stream.best_cost >= optimum.best_cost - 1e-6
+
+
+@pytest.mark.parametrize("mode", OPTIMIZATION_MODES)
+def test_selecting_only_the_locked_open_sites_prices_them(mode):
+    model = locked_network({2: "open", 6: "open", 5: "closed"})
+    pinned_cost = selection_cost(cost_columns(model, np.array([2, 6])), [0, 1])
+    outcome = optimize(model, "DC", OptimizationSettings(mode=mode, num_dcs=2))
+    assert outcome.error is None
+    if mode == PARETO_FRONTIER:
+        assert {point["num_dcs"] for point in outcome.pareto_frontier} == {2}
+        return
+    assert outcome.stream.as_result(outcome.status)["optimal_facilities"] == [
+        model.facility_names[2],
+        model.facility_names[6],
+    ]
+    assert outcome.stream.best_cost == approx(pinned_cost)
+
+
+def test_selecting_fewer_than_the_locked_open_sites_is_rejected():
+    model = locked_network({2: "open"})
+    with pytest.raises(ValueError, match="1 site is locked open"):
+        optimization_problem(model, "DC", 0, GREEDY_INTERCHANGE)
+
+
+def test_penalized_runs_report_transport_cost():
+    scenario = synthetic_scenario(300, 9, seed=1)
+    plain = optimize(
+        scenario.compile(), "DC", OptimizationSettings(num_dcs=3)
+    ).stream.as_result("completed")
+    assert plain["service_penalty_cost"] == 0
+
+    model = scenario.compile(service_penalty=5.0)
+    outcome = optimize(model, "DC", OptimizationSettings(num_dcs=3))
+    result = outcome.stream.as_result(outcome.status)
+    selection = [
+        model.facility_names.index(name) for name in result["optimal_facilities"]
+    ]
+    assert result["best_cost"] == approx(transport_cost(model, selection))
+    assert result["service_penalty_cost"] > 0
+    assert result["best_cost"] + result["service_penalty_cost"] == approx(
+        outcome.stream.best_cost
+    )
+    assert result["baseline_cost"] == approx(transport_cost(model, range(9)))
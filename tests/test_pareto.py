@@ -0,0 +1,52 @@
+from app.engine.api import OptimizationSettings, optimize
+from app.engine.optimization import PARETO_FRONTIER, pareto_frontier
+from benchmarks.synthetic import synthetic_scenario
+
+
+def point(num_dcs: int, total_cost: float, next_day_share: float) -> dict:
+    return {
+        "num_dcs": num_dcs,
+        "service_penalty": 0.0,
+        "total_cost": total_cost,
+        "next_day_share": next_day_share,
+        "facilities": [],
+    }
+
+
+def test_frontier_keeps_only_non_dominated_points_per_site_count():
+    points = [
+        point(1, 100, 40),
+        point(1, 120, 60),
+        point(1, 130, 50),
+        point(1, 90, 30),
+        point(2, 80, 70),
+        point(2, 80, 70),
+    ]
+    frontier = pareto_frontier(points)
+    assert [(p["num_dcs"], p["total_cost"]) for p in frontier] == [
+        (1, 90),
+        (1, 100),
+        (1, 120),
+        (2, 80),
+    ]
+
+
+def test_higher_penalties_never_lower_next_day_share():
+    model = synthetic_scenario(400, 8, seed=5).compile()
+    outcome = optimize(
+        model,
+        "DC",
+        OptimizationSettings(
+            mode=PARETO_FRONTIER, num_dcs=3, pareto_penalties=(0.0, 50.0, 500.0)
+        ),
+    )
+    assert outcome.error is None
+    by_size: dict[int, list[dict]] = {}
+    for p in outcome.pareto_frontier:
+        by_size.setdefault(p["num_dcs"], []).append(p)
+    assert sorted(by_size) == [1, 2, 3]
+    for frontier in by_size.values():
+        costs = [p["total_cost"] for p in frontier]
+        shares = [p["next_day_share"] for p in frontier]
+        assert costs == sorted(costs)
+        assert shares == sorted(shares)
@@ -0,0 +1,38 @@
+from app.engine.progress import ProgressPublisher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_publishes_at_most_once_per_interval():
+    clock = FakeClock()
+    publisher = ProgressPublisher(interval=1.0, clock=clock)
+    assert publisher.should_publish(1)
+    clock.now = 0.5
+    assert not publisher.should_publish(50)
+    clock.now = 1.0
+    assert publisher.should_publish(60)
+
+
+def test_skips_frames_that_change_nothing_visible():
+    clock = FakeClock()
+    publisher = ProgressPublisher(interval=1.0, clock=clock)
+    assert publisher.should_publish(10.2, 1000.001)
+    clock.now = 5.0
+    assert not publisher.should_publish(9.8, 1000.004)
+    assert publisher.should_publish(9.8, 999.0)
+    clock.now = 10.0
+    assert publisher.should_publish(11, 999.0)
+
+
+def test_force_bypasses_interval_and_dedup():
+    clock = FakeClock()
+    publisher = ProgressPublisher(interval=1.0, clock=clock)
+    assert publisher.should_publish(100)
+    assert publisher.should_publish(100, force=True)
+    assert not publisher.should_publish(100)
@@ -0,0 +1,55 @@
+import json
+import numpy as np
+from dataclasses import replace
+from app.engine.result_cache import (
+    TOTALS_SCHEMA,
+    SimulationCache,
+    simulation_key,
+    totals_from_json,
+    totals_to_json,
+)
+from app.engine.simulation import simulate_chunk
+from benchmarks.synthetic import synthetic_scenario
+
+
+def test_key_depends_only_on_simulation_inputs():
+    scenario = synthetic_scenario(200, 5, seed=2)
+    model = scenario.compile()
+    key = simulation_key(model)
+    assert key.startswith(f"{TOTALS_SCHEMA}:")
+    assert simulation_key(replace(scenario, name="other session").compile()) == key
+    assert simulation_key(scenario.compile(service_penalty=50.0)) == key
+    assert simulation_key(replace(model, fixed_open=(1,))) == key
+    moved = [dict(f) for f in scenario.facilities]
+    moved[0]["latitude"] += 0.5
+    assert simulation_key(replace(scenario, facilities=moved).compile()) != key
+    cheaper = [{"mode": "Parcel", "cost_per_mile": 0.1}]
+    assert simulation_key(replace(scenario, transport_costs=cheaper).compile()) != key
+
+
+def test_totals_round_trip_through_json():
+    totals = simulate_chunk(synthetic_scenario(200, 5, seed=2).compile())
+    decoded = totals_from_json(totals_to_json(totals))
+    assert decoded._fields == totals._fields
+    for value, expected in zip(decoded, totals):
+        np.testing.assert_array_equal(value, expected)
+
+
+def test_rows_from_another_schema_decode_as_misses():
+    totals = simulate_chunk(synthetic_scenario(50, 3, seed=2).compile())
+    data = json.loads(totals_to_json(totals))
+    assert totals_from_json(json.dumps({**data, "extra_field": 1.0})) is None
+    data.pop("demand_units")
+    assert totals_from_json(json.dumps(data)) is None
+    assert totals_from_json("not json") is None
+
+
+def test_cache_evicts_least_recently_used():
+    totals = simulate_chunk(synthetic_scenario(50, 3, seed=2).compile())
+    cache = SimulationCache(max_entries=2)
+    cache.put("a", totals)
+    cache.put("b", totals)
+    assert cache.get("a") is totals
+    cache.put("c", totals)
+    assert cache.get("b") is None
+    assert cache.get("a") is totals and cache.get("c") is totals
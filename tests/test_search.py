@@ -0,0 +1,62 @@
+import asyncio
+import math
+from app.engine.api import OptimizationSettings, optimize
+from app.engine.optimization import BRUTE_FORCE
+from app.engine.search import SearchRunner, optimization_problem, run_search
+from benchmarks.synthetic import synthetic_scenario
+
+
+class CheckpointingRunner(SearchRunner):
+    """Keeps brute-force checkpoints in memory; cancels after stop_after shards."""
+
+    def __init__(self, saved=None, stop_after: int | None = None):
+        super().__init__()
+        self.saved = saved
+        self.stop_after = stop_after
+        self.first_rank: int | None = None
+        self.cleared = False
+
+    async def shards(self, control, stream, tasks, on_result, *args, **kwargs):
+        for i, (fn, task_args, _) in enumerate(tasks):
+            if self.first_rank is None:
+                self.first_rank = task_args[3]
+            await on_result(i, fn(*task_args))
+            if self.stop_after is not None and i + 1 >= self.stop_after:
+                control.cancel_event.set()
+                break
+
+    async def resume(self, job_key):
+        if self.saved is None:
+            return 0, math.inf, []
+        next_rank, _, best_cost, facilities = self.saved
+        return next_rank, best_cost, facilities
+
+    async def checkpoint(self, job_key, next_rank, total, best_cost, best_facilities):
+        self.saved = (next_rank, total, best_cost, best_facilities)
+
+    async def clear_checkpoint(self, job_key):
+        self.cleared = True
+
+
+def test_brute_force_resumes_from_its_checkpoint():
+    model = synthetic_scenario(200, 10, seed=4).compile()
+    problem = optimization_problem(model, "DC", 4, BRUTE_FORCE)
+    total = math.comb(10, 4)
+
+    interrupted = CheckpointingRunner(stop_after=3)
+    outcome = asyncio.run(run_search(problem, interrupted))
+    assert outcome.status == "cancelled"
+    next_rank, saved_total, _, _ = interrupted.saved
+    assert saved_total == total
+    assert 0 < next_rank < total
+    assert not interrupted.cleared
+
+    resumed = CheckpointingRunner(saved=interrupted.saved)
+    outcome = asyncio.run(run_search(problem, resumed))
+    assert outcome.status == "completed"
+    assert resumed.first_rank == next_rank
+    assert resumed.cleared
+
+    full = optimize(model, "DC", OptimizationSettings(mode=BRUTE_FORCE, num_dcs=4))
+    assert outcome.stream.best_cost == full.stream.best_cost
+    assert outcome.stream.facilities == full.stream.facilities
@@ -0,0 +1,73 @@
+import pytest
+from dataclasses import replace
+from app.engine.sensitivity import cost_aggregates, rate_sweep, reprice
+from app.engine.simulation import FALLBACK_SOURCE_NAME, finalize_result, simulate_chunk
+from benchmarks.synthetic import synthetic_scenario
+
+BASE_RATES = {"Parcel": 0.5, "LTL": 2.0, "TL": 3.0}
+NEW_RATES = {"Parcel": 0.8, "LTL": 2.0, "TL": 1.5}
+
+
+def transport_costs(rates):
+    return [{"mode": mode, "cost_per_mile": cost} for mode, cost in rates.items()]
+
+
+def scenarios():
+    scenario = synthetic_scenario(400, 6, seed=3)
+    return [
+        replace(scenario, transport_costs=transport_costs(BASE_RATES)),
+        replace(
+            scenario,
+            transport_costs=transport_costs(BASE_RATES),
+            edge_overrides=[
+                {"from_node_id": "port-0", "to_node_id": "dc-1", "cost_per_mile": 0.2},
+                {"from_node_id": "port-3", "to_node_id": "dc-4", "cost_per_mile": 9.0},
+            ],
+        ),
+        replace(
+            scenario, transport_costs=transport_costs(BASE_RATES), inbound_sources=()
+        ),
+    ]
+
+
+def assert_same_costs(actual, expected):
+    assert actual["total_cost"] == pytest.approx(expected["total_cost"])
+    assert actual["cost_breakdown"] == pytest.approx(expected["cost_breakdown"])
+    assert actual["avg_inbound_dist"] == pytest.approx(expected["avg_inbound_dist"])
+    assert actual["inbound_volume"] == expected["inbound_volume"]
+
+
+@pytest.mark.parametrize(
+    "scenario", scenarios(), ids=["plain", "overrides", "fallback"]
+)
+def test_reprice_matches_a_full_resimulation(scenario):
+    model = scenario.compile()
+    totals = simulate_chunk(model)
+    result = finalize_result(model, totals)
+    repriced = reprice(cost_aggregates(model, totals), result, NEW_RATES)
+
+    rerun = replace(scenario, transport_costs=transport_costs(NEW_RATES)).compile()
+    assert_same_costs(repriced, finalize_result(rerun, simulate_chunk(rerun)))
+    if not scenario.inbound_sources:
+        assert list(repriced["inbound_volume"]) == [FALLBACK_SOURCE_NAME]
+
+
+def test_rate_sweep_reprices_every_combination():
+    scenario = scenarios()[0]
+    model = scenario.compile()
+    totals = simulate_chunk(model)
+    result = finalize_result(model, totals)
+    grid = {"Parcel": [0.4, 0.8], "TL": [1.5, 3.0, 4.5]}
+    sweep = rate_sweep(cost_aggregates(model, totals), result, BASE_RATES, grid)
+    assert [(s["mode_costs"]["Parcel"], s["mode_costs"]["TL"]) for s in sweep] == [
+        (parcel, tl) for parcel in grid["Parcel"] for tl in grid["TL"]
+    ]
+    for point in sweep:
+        rerun = replace(
+            scenario, transport_costs=transport_costs(point["mode_costs"])
+        ).compile()
+        expected = finalize_result(rerun, simulate_chunk(rerun))
+        assert point["total_cost"] == pytest.approx(expected["total_cost"])
+        assert point["inbound_cost"] == pytest.approx(
+            expected["cost_breakdown"]["inbound"]
+        )
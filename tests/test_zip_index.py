@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from app.engine.zip_index import (
+    ZIP3_KEY_OFFSET,
+    ZIP5_SOURCE_PATH,
+    build_zip_index,
+    load_zip_index,
+    read_centroid_rows,
+    resolve_zip_codes,
+    zip_key,
+)
+
+ROWS = [
+    ("02101", 42.0, -71.0),
+    ("02108", 42.4, -71.2),
+    ("10001", 40.75, -73.99),
+    ("902", 34.0, -118.0),
+]
+
+
+@pytest.mark.parametrize(
+    "zip_code, key",
+    [
+        ("02101", 2101),
+        ("2101", 2101),
+        ("02101-1234", 2101),
+        ("021011234", 2101),
+        ("021", ZIP3_KEY_OFFSET + 21),
+        ("", -1),
+        ("12", -1),
+    ],
+)
+def test_zip_key(zip_code, key):
+    assert zip_key(zip_code) == key
+
+
+def test_unknown_zip5_falls_back_to_its_zip3_prefix():
+    index = build_zip_index(ROWS)
+    lat, lon = resolve_zip_codes(["02108", "02199", "90210", "99999", "abc"], index)
+    np.testing.assert_allclose(lat[:3], [42.4, 42.2, 34.0], rtol=1e-6)
+    np.testing.assert_allclose(lon[:3], [-71.2, -71.1, -118.0], rtol=1e-6)
+    assert np.isnan(lat[3:]).all() and np.isnan(lon[3:]).all()
+
+
+def test_bundled_index_resolves_the_bundled_zip5_table():
+    rows = read_centroid_rows(ZIP5_SOURCE_PATH)[::500]
+    lat, lon = resolve_zip_codes([zip_code for zip_code, _, _ in rows])
+    np.testing.assert_allclose(lat, [row[1] for row in rows], atol=1e-4)
+    np.testing.assert_allclose(lon, [row[2] for row in rows], atol=1e-4)
+    assert np.all(np.diff(load_zip_index()["key"].astype(np.int64)) > 0)